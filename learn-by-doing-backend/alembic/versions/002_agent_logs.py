@@ -0,0 +1,38 @@
+"""Add agent_logs table.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Agent actions of a generation job, one row per log entry
+    op.create_table(
+        'agent_logs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('generation_jobs.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('agent', sa.String(50), nullable=False),
+        sa.Column('action', sa.String(200), nullable=False),
+        sa.Column('iteration', sa.Integer, default=0),
+        sa.Column('details', postgresql.JSONB(astext_type=sa.Text())),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_agent_logs_job_id ON agent_logs (job_id)")
+
+
+def downgrade() -> None:
+    op.drop_index('idx_agent_logs_job_id', table_name='agent_logs')
+    op.drop_table('agent_logs')
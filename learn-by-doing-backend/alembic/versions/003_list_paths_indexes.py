@@ -0,0 +1,39 @@
+"""Add partial indexes for listing active paths.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-20 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # list_paths filters active paths, optionally by language or area, and
+    # returns the newest first; each index returns rows already in that
+    # order (scanned backward), so no sort is needed
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paths_active_created "
+            "ON learning_paths (created_at) WHERE status = 'active'"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paths_active_language_created "
+            "ON learning_paths (language, created_at) WHERE status = 'active'"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paths_active_area_created "
+            "ON learning_paths (area, created_at) WHERE status = 'active'"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_paths_active_area_created', table_name='learning_paths')
+    op.drop_index('idx_paths_active_language_created', table_name='learning_paths')
+    op.drop_index('idx_paths_active_created', table_name='learning_paths')
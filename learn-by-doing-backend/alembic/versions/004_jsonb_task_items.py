@@ -0,0 +1,100 @@
+"""Convert JSON columns to JSONB and store task items as rows.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# Columns created as json by 001
+JSON_COLUMNS = [
+    ('learning_paths', 'raw_data'),
+    ('learning_paths', 'generation_metadata'),
+    ('phases', 'raw_data'),
+    ('tasks', 'prerequisites'),
+    ('tasks', 'resources'),
+    ('tasks', 'raw_data'),
+    ('generation_jobs', 'result_data'),
+]
+
+# Child table holding each former JSON array column of tasks
+TASK_ITEM_TABLES = [
+    ('task_requirements', 'requirements'),
+    ('task_acceptance_criteria', 'acceptance_criteria'),
+]
+
+
+def upgrade() -> None:
+    # Requirements and acceptance criteria are queried per item, so store
+    # them as rows instead of JSON arrays on tasks
+    for table, column in TASK_ITEM_TABLES:
+        op.create_table(
+            table,
+            sa.Column('task_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('order_index', sa.Integer, nullable=False),
+            sa.Column('text', sa.Text, nullable=False),
+            sa.PrimaryKeyConstraint('task_id', 'order_index')
+        )
+        op.execute(
+            f"INSERT INTO {table} (task_id, order_index, text) "
+            f"SELECT tasks.id, item.ordinality - 1, item.value "
+            f"FROM tasks CROSS JOIN LATERAL json_array_elements_text(tasks.{column}) "
+            f"WITH ORDINALITY AS item(value, ordinality) "
+            f"WHERE json_typeof(tasks.{column}) = 'array' AND item.value IS NOT NULL"
+        )
+        op.drop_column('tasks', column)
+    
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using=f'{column}::jsonb'
+        )
+    
+    # Task ids are unique within a path; tasks are upserted on this key.
+    # Paths saved before this revision may repeat an id, so all but the
+    # oldest task of each id are renamed to <id>-<row uuid> first.
+    op.execute(
+        "UPDATE tasks SET task_id = left(tasks.task_id, 63) || '-' || tasks.id::text "
+        "FROM (SELECT id, row_number() OVER (PARTITION BY path_id, task_id "
+        "ORDER BY created_at, id) AS n FROM tasks WHERE path_id IS NOT NULL) AS ranked "
+        "WHERE tasks.id = ranked.id AND ranked.n > 1"
+    )
+    op.create_unique_constraint('uq_tasks_path_task', 'tasks', ['path_id', 'task_id'])
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paths_raw_gin "
+            "ON learning_paths USING gin (raw_data jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_paths_raw_gin', table_name='learning_paths')
+    op.drop_constraint('uq_tasks_path_task', 'tasks', type_='unique')
+    
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.JSON,
+            postgresql_using=f'{column}::json'
+        )
+    
+    for table, column in TASK_ITEM_TABLES:
+        op.add_column('tasks', sa.Column(column, sa.JSON, default=list))
+        op.execute(
+            f"UPDATE tasks SET {column} = items.value "
+            f"FROM (SELECT task_id, json_agg(text ORDER BY order_index) AS value "
+            f"FROM {table} GROUP BY task_id) AS items "
+            f"WHERE tasks.id = items.task_id"
+        )
+        op.drop_table(table)
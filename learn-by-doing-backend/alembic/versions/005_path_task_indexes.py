@@ -0,0 +1,46 @@
+"""Replace redundant path and task indexes.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-05 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Duplicates of idx_paths_language and idx_paths_area; the unique
+        # ix_learning_paths_slug stays, it enforces slug uniqueness
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_learning_paths_language")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_learning_paths_area")
+        
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_paths_difficulty ON learning_paths (difficulty_level)")
+        
+        # The composite indexes also serve path_id-only and phase_id-only
+        # lookups through their leading column. A phase belongs to a single
+        # path, so the (path_id, task_id) dedupe in 004 already makes
+        # (phase_id, task_id) unique.
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_path_phase ON tasks (path_id, phase_id)")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_phase_task_id ON tasks (phase_id, task_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_path_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_phase_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_phase_id ON tasks (phase_id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tasks_path_id ON tasks (path_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_phase_task_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_path_phase")
+        
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_paths_difficulty")
+        
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_learning_paths_area ON learning_paths (area)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_learning_paths_language ON learning_paths (language)")
@@ -1,17 +1,54 @@
 """Base agent class."""
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from string import Formatter
 from typing import Any, Optional
-from app.core.llm import OpenRouterClient
+from app.core.llm import get_llm_client
 from app.core.logging import logger
+from app.core.serialization import dumps
 from app.workflow.state import WorkflowState
 
 
+def prompt_json(obj: Any) -> str:
+    """
+    Serialize an agent output for inclusion in a prompt.
+    
+    Compact output: indentation only adds input tokens to the prompt.
+    """
+    return dumps(obj, sort_keys=True)
+
+
+class PromptTemplate:
+    """
+    A str.format()-style prompt parsed once into literal chunks.
+    
+    Rendering drops the values into the precomputed chunk list and joins it,
+    instead of re-parsing the whole template on every call.
+    """
+    
+    def __init__(self, template: str):
+        self._chunks: list[str] = []
+        self._fields: list[tuple[int, str]] = []
+        for literal, field, _, _ in Formatter().parse(template):
+            self._chunks.append(literal)
+            if field is not None:
+                self._fields.append((len(self._chunks), field))
+                self._chunks.append("")
+    
+    def render(self, **values: Any) -> str:
+        """Fill in the placeholders."""
+        chunks = self._chunks.copy()
+        for index, field in self._fields:
+            chunks[index] = str(values[field])
+        return "".join(chunks)
+
+
 class BaseAgent(ABC):
     """Base class for all agents."""
     
     def __init__(self, name: str):
         self.name = name
-        self.llm = OpenRouterClient()
+        self.llm = get_llm_client()
         logger.info(f"Initialized agent: {name}")
     
     @abstractmethod
@@ -33,11 +70,24 @@ class BaseAgent(ABC):
             "agent": self.name,
             "action": action,
             "iteration": state.get("iteration", 0),
-            "details": details or {}
+            "details": details or {},
+            "created_at": datetime.now(timezone.utc)
         }
         state["agent_logs"].append(log_entry)
         logger.info(f"[{self.name}] {action}")
     
+    def research_findings_json(self, state: WorkflowState) -> str:
+        """Get research findings as prompt JSON, serialized once per workflow."""
+        if not state.get("research_findings_json"):
+            state["research_findings_json"] = prompt_json(state["research_findings"])
+        return state["research_findings_json"]
+    
+    def draft_curriculum_json(self, state: WorkflowState) -> str:
+        """Get the draft curriculum as JSON, serializing it once per draft."""
+        if not state.get("draft_curriculum_json"):
+            state["draft_curriculum_json"] = prompt_json(state["draft_curriculum"])
+        return state["draft_curriculum_json"]
+    
     def add_error(self, state: WorkflowState, error: str):
         """Add error to state."""
         state["errors"].append(f"[{self.name}] {error}")
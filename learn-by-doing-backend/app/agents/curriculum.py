@@ -1,7 +1,7 @@
 """Curriculum Designer Agent - creates learning path structure."""
-import json
+import asyncio
 from slugify import slugify
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, PromptTemplate
 from app.agents.tools import get_search_client
 from app.workflow.state import WorkflowState
 from app.core.logging import logger
@@ -112,6 +112,7 @@ Output MUST be valid JSON matching this structure:
         }}
     ]
 }}"""
+    SYSTEM_TEMPLATE = PromptTemplate(SYSTEM_PROMPT)
     
     def __init__(self):
         super().__init__("CurriculumAgent")
@@ -146,8 +147,8 @@ The previous draft had these issues that must be fixed:
             messages = [
                 {
                     "role": "system",
-                    "content": self.SYSTEM_PROMPT.format(
-                        research_findings=json.dumps(state["research_findings"], indent=2)
+                    "content": self.SYSTEM_TEMPLATE.render(
+                        research_findings=self.research_findings_json(state)
                     ) + expert_feedback
                 },
                 {
@@ -188,8 +189,9 @@ The previous draft had these issues that must be fixed:
             logger.info("Searching for documentation URLs...")
             await self._enrich_resources_with_search(response, state["topic"])
             
-            # Store in state
+            # Store in state; the cached serialization belongs to the old draft
             state["draft_curriculum"] = response
+            state["draft_curriculum_json"] = None
             
             self.log_action(
                 state,
@@ -219,52 +221,53 @@ The previous draft had these issues that must be fixed:
             topic: Main topic
         """
         try:
-            # Get unique concepts from all tasks
-            concepts_to_search = set()
+            # Pick the tasks to search documentation for (limit to save time)
+            tasks_to_search = []
             for phase in curriculum.get("phases", []):
                 for task in phase.get("tasks", []):
-                    task_title = task.get("title", "")
-                    # Extract key terms from title
-                    concepts_to_search.add(task_title)
+                    if len(tasks_to_search) >= 5:  # Limit searches
+                        break
+                    tasks_to_search.append(task)
+            
+            # The searches are independent, so run them concurrently
+            results_list = await asyncio.gather(
+                *(
+                    self.search_client.search_documentation(
+                        f"{topic} {task.get('title', '')} documentation official",
+                        max_results=2
+                    )
+                    for task in tasks_to_search
+                ),
+                return_exceptions=True
+            )
             
-            # Search for documentation for each concept (limit to save time)
             searched_concepts = 0
-            for phase in curriculum.get("phases", []):
-                for task in phase.get("tasks", []):
-                    if searched_concepts >= 5:  # Limit searches
-                        break
+            for task, results in zip(tasks_to_search, results_list):
+                task_title = task.get("title", "")
+                
+                if isinstance(results, Exception):
+                    logger.warning(f"Failed to search docs for {task_title}: {str(results)}")
+                    continue
+                
+                if results:
+                    # Add or replace resources
+                    current_resources = task.get("resources", [])
+                    existing_urls = {r.get("url") for r in current_resources}
                     
-                    task_title = task.get("title", "")
+                    for result in results[:2]:  # Top 2 results
+                        # Check if not already present
+                        url = result.get("url", "")
+                        if url and url not in existing_urls:
+                            current_resources.append({
+                                "title": result.get("title", "Documentation"),
+                                "url": url,
+                                "type": "documentation",
+                                "description": result.get("snippet", "")[:100]
+                            })
+                            existing_urls.add(url)
                     
-                    # Search for docs
-                    try:
-                        search_query = f"{topic} {task_title} documentation official"
-                        results = await self.search_client.search_documentation(
-                            search_query, 
-                            max_results=2
-                        )
-                        
-                        if results:
-                            # Add or replace resources
-                            current_resources = task.get("resources", [])
-                            
-                            for result in results[:2]:  # Top 2 results
-                                # Check if not already present
-                                url = result.get("url", "")
-                                if not any(r.get("url") == url for r in current_resources):
-                                    current_resources.append({
-                                        "title": result.get("title", "Documentation"),
-                                        "url": url,
-                                        "type": "documentation",
-                                        "description": result.get("snippet", "")[:100]
-                                    })
-                            
-                            task["resources"] = current_resources[:5]  # Max 5 resources
-                            searched_concepts += 1
-                            
-                    except Exception as e:
-                        logger.warning(f"Failed to search docs for {task_title}: {str(e)}")
-                        continue
+                    task["resources"] = current_resources[:5]  # Max 5 resources
+                    searched_concepts += 1
             
             logger.info(f"Enriched {searched_concepts} tasks with documentation URLs")
             
@@ -1,6 +1,5 @@
 """Domain Expert Agent - validates technical accuracy."""
-import json
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, PromptTemplate
 from app.workflow.state import WorkflowState
 from app.core.logging import logger
 
@@ -78,6 +77,7 @@ Output MUST be valid JSON:
         "what's done well 2"
     ]
 }}"""
+    SYSTEM_TEMPLATE = PromptTemplate(SYSTEM_PROMPT)
     
     def __init__(self):
         super().__init__("ExpertAgent")
@@ -91,9 +91,9 @@ Output MUST be valid JSON:
             messages = [
                 {
                     "role": "system",
-                    "content": self.SYSTEM_PROMPT.format(
-                        research_findings=json.dumps(state["research_findings"], indent=2),
-                        draft_curriculum=json.dumps(state["draft_curriculum"], indent=2)
+                    "content": self.SYSTEM_TEMPLATE.render(
+                        research_findings=self.research_findings_json(state),
+                        draft_curriculum=self.draft_curriculum_json(state)
                     )
                 },
                 {
@@ -1,8 +1,9 @@
 """Research Agent - discovers topic information using web search."""
-import json
-from typing import Any
-from app.agents.base import BaseAgent
-from app.agents.tools import get_search_client
+import asyncio
+from typing import Any, Callable
+from app.agents.base import BaseAgent, PromptTemplate, prompt_json
+from app.agents.tools import get_search_client, url_hash
+from app.core.llm_cache import CachingLLMClient, get_llm_cache
 from app.workflow.state import WorkflowState
 from app.core.logging import logger
 
@@ -106,8 +107,18 @@ Output MUST be valid JSON with this structure:
     }}
 }}"""
     
+    SYSTEM_TEMPLATE = PromptTemplate(SYSTEM_PROMPT)
+    
+    REQUIRED_KEYS = frozenset({
+        "topic_analysis", "prerequisites", "core_concepts", "ecosystem", "scope_assessment"
+    })
+    
+    # Approximate token budget for the search results block (~4 chars per token)
+    SEARCH_RESULTS_TOKEN_BUDGET = 1500
+    
     def __init__(self):
         super().__init__("ResearchAgent")
+        self.llm = CachingLLMClient(self.llm, get_llm_cache())
         self.search_client = get_search_client()
     
     async def run(self, state: WorkflowState) -> WorkflowState:
@@ -130,26 +141,35 @@ Output MUST be valid JSON with this structure:
                 f"{topic} ecosystem tools libraries"
             ]
             
-            # Perform searches
+            # Perform searches concurrently, limited to the 3 most different queries
+            queries = self._select_diverse_queries(search_queries, topic, max_n=3)
+            gathered = await asyncio.gather(
+                *(self.search_client.search(query, max_results=3) for query in queries),
+                return_exceptions=True
+            )
+            
             search_results = []
-            for query in search_queries[:3]:  # Limit to 3 queries to save time
-                try:
-                    results = await self.search_client.search(query, max_results=3)
-                    search_results.extend(results)
-                except Exception as e:
-                    logger.warning(f"Search query failed: {query} - {str(e)}")
+            for query, results in zip(queries, gathered):
+                if isinstance(results, Exception):
+                    logger.warning(f"Search query failed: {query} - {str(results)}")
                     continue
+                search_results.extend(results)
             
-            # Remove duplicates by URL
-            seen_urls = set()
+            # Remove duplicates by normalized URL, keeping the top 10
+            seen_hashes: set[bytes] = set()
             unique_results = []
             for result in search_results:
                 url = result.get("url", "")
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
+                if not url:
+                    continue
+                key = url_hash(url)
+                if key not in seen_hashes:
+                    seen_hashes.add(key)
                     unique_results.append(result)
+                    if len(unique_results) == 10:
+                        break
             
-            search_results = unique_results[:10]  # Keep top 10
+            search_results = unique_results
             
             logger.info(f"Found {len(search_results)} unique search results")
             
@@ -160,7 +180,7 @@ Output MUST be valid JSON with this structure:
             messages = [
                 {
                     "role": "system",
-                    "content": self.SYSTEM_PROMPT.format(
+                    "content": self.SYSTEM_TEMPLATE.render(
                         search_results=search_context,
                         topic=topic,
                         context=context,
@@ -177,30 +197,39 @@ Output MUST be valid JSON with this structure:
             response = await self.llm.generate_json(
                 messages=messages,
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                on_partial=self._progress_callback(state)
             )
             
             # Add search metadata
             response["search_metadata"] = {
                 "sources_found": len(search_results),
                 "confidence": "high" if len(search_results) >= 5 else "medium" if len(search_results) >= 3 else "low",
-                "search_queries": search_queries[:3]
+                "search_queries": queries
             }
             
-            # Store raw search results for resource extraction
-            response["_raw_search_results"] = search_results
+            # Store trimmed search results for resource extraction; they are
+            # serialized into every downstream prompt, so keep only the essentials
+            response["_raw_search_results"] = [
+                {
+                    "title": result.get("title", ""),
+                    "url": result.get("url", ""),
+                    "snippet": result.get("snippet", "")[:200]
+                }
+                for result in search_results
+            ]
             
             # Validate response structure
-            required_keys = ["topic_analysis", "prerequisites", "core_concepts", "ecosystem", "scope_assessment"]
-            missing_keys = [key for key in required_keys if key not in response]
+            missing_keys = sorted(self.REQUIRED_KEYS - response.keys())
             if missing_keys:
                 logger.error(f"Response missing keys: {missing_keys}")
                 logger.error(f"Response keys found: {list(response.keys())}")
                 logger.error(f"Response preview: {str(response)[:500]}")
                 raise ValueError(f"Missing required keys: {missing_keys}")
             
-            # Store in state
+            # Store in state, serialized once for the downstream prompts
             state["research_findings"] = response
+            state["research_findings_json"] = prompt_json(response)
             
             self.log_action(
                 state, 
@@ -225,17 +254,91 @@ Output MUST be valid JSON with this structure:
         
         return state
     
+    @staticmethod
+    def _select_diverse_queries(queries: list[str], topic: str, max_n: int) -> list[str]:
+        """
+        Pick the queries that overlap least with each other.
+        
+        Greedy farthest-point selection over the Jaccard distance of each
+        query's words, ignoring the topic words they all share. The first
+        query is always kept.
+        
+        Args:
+            queries: Candidate queries, most important first
+            topic: Topic included in every query
+            max_n: Maximum number of queries to return
+        
+        Returns:
+            Selected queries in their original order
+        """
+        if len(queries) <= max_n:
+            return queries
+        
+        topic_words = set(topic.lower().split())
+        words = [set(query.lower().split()) - topic_words for query in queries]
+        
+        def distance(a: set[str], b: set[str]) -> float:
+            union = a | b
+            return 1.0 - len(a & b) / len(union) if union else 0.0
+        
+        selected = [0]
+        while len(selected) < max_n:
+            best = max(
+                (i for i in range(len(queries)) if i not in selected),
+                key=lambda i: min(distance(words[i], words[j]) for j in selected)
+            )
+            selected.append(best)
+        
+        return [queries[i] for i in sorted(selected)]
+    
+    def _progress_callback(self, state: WorkflowState) -> Callable[[dict[str, Any]], bool]:
+        """
+        Build a callback that logs the topic analysis as soon as it has streamed in.
+        
+        The model has finished topic_analysis once a later key appears in
+        the partial object, well before the rest of the response arrives.
+        """
+        reported = False
+        
+        def on_partial(partial: dict[str, Any]) -> bool:
+            nonlocal reported
+            if reported:
+                return True
+            if "topic_analysis" not in partial or len(partial) < 2:
+                return False
+            reported = True
+            
+            topic_analysis = partial["topic_analysis"]
+            if isinstance(topic_analysis, dict):
+                self.log_action(
+                    state,
+                    "Topic analysis received",
+                    {
+                        "learning_curve": topic_analysis.get("learning_curve"),
+                        "popularity": topic_analysis.get("popularity")
+                    }
+                )
+            return True
+        
+        return on_partial
+    
     def _format_search_results(self, results: list) -> str:
         """Format search results for inclusion in prompt."""
         if not results:
             return "No web search results found. Relying on general knowledge."
         
         formatted = []
+        budget = self.SEARCH_RESULTS_TOKEN_BUDGET * 4
         for i, result in enumerate(results[:8], 1):  # Top 8 results
-            formatted.append(
+            entry = (
                 f"[{i}] {result.get('title', 'No title')}\n"
                 f"URL: {result.get('url', 'No URL')}\n"
-                f"Content: {result.get('snippet', 'No snippet')[:300]}\n"
+                f"Content: {result['snippet'][:300] if 'snippet' in result else 'No snippet'}\n"
             )
+            budget -= len(entry)
+            if budget < 0 and formatted:
+                logger.info(f"Search results over token budget, dropped {min(len(results), 8) - len(formatted)}")
+                break
+            formatted.append(entry)
         
         return "\n\n".join(formatted)
@@ -1,17 +1,115 @@
 """Web search utilities using DuckDuckGo."""
 import asyncio
+import hashlib
 from typing import List, Dict, Any, Optional
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+import aiohttp
+from selectolax.parser import HTMLParser
+from app.core.llm_cache import MemoryCacheBackend
 from app.core.logging import logger
 from app.config import get_settings
 
 
+TRACKING_PARAMS = frozenset({"fbclid", "gclid"})
+
+DDG_HTML_URL = "https://html.duckduckgo.com/html/"
+
+# DuckDuckGo's kp parameter for each safesearch level
+DDG_SAFESEARCH = {"on": "1", "moderate": "-1", "off": "-2"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different links compare equal.
+    
+    Lowercases scheme and host, drops the default http/https distinction,
+    trailing slashes, fragments and tracking query parameters.
+    
+    Args:
+        url: URL to normalize
+    
+    Returns:
+        Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ])
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def url_hash(url: str) -> bytes:
+    """Compact hash of a normalized URL for duplicate detection."""
+    return hashlib.blake2b(normalize_url(url).encode(), digest_size=16).digest()
+
+
+def _node_text(node) -> str:
+    """Text of a node with whitespace collapsed, keeping the spaces around highlighted terms."""
+    return " ".join(node.text().split())
+
+
+def parse_html_results(html: str, max_results: int) -> List[Dict[str, Any]]:
+    """
+    Extract the organic results from a DuckDuckGo HTML results page.
+    
+    Args:
+        html: Page returned by the HTML endpoint
+        max_results: Max results
+    
+    Returns:
+        Results with the redirect links resolved to their targets
+    """
+    results = []
+    for node in HTMLParser(html).css("div.result"):
+        if "result--ad" in (node.attributes.get("class") or ""):
+            continue
+        
+        link = node.css_first("a.result__a")
+        if link is None:
+            continue
+        
+        url = link.attributes.get("href") or ""
+        # Results link through a redirect that carries the target in uddg
+        if "duckduckgo.com/l/" in url:
+            url = parse_qs(urlsplit(url).query).get("uddg", [""])[0]
+        # Ad clicks go through y.js, also outside result--ad blocks
+        if not url or "duckduckgo.com/y.js" in url:
+            continue
+        
+        snippet = node.css_first(".result__snippet")
+        results.append({
+            "title": _node_text(link),
+            "url": url,
+            "snippet": _node_text(snippet) if snippet is not None else "",
+            "source": "duckduckgo"
+        })
+        if len(results) >= max_results:
+            break
+    
+    return results
+
+
 class WebSearchClient:
-    """Client for web search using DuckDuckGo (free, no API key)."""
+    """
+    Client for web search using DuckDuckGo (free, no API key).
+    
+    Default searches go straight to the DuckDuckGo HTML endpoint over a
+    pooled aiohttp session; the ddgs library is the fallback and handles
+    explicit backends.
+    """
     
     def __init__(self):
         # Lazy import to avoid nest_asyncio patching uvloop at module load
         from ddgs import DDGS
         self.ddgs = DDGS()
+        self._session: Optional[aiohttp.ClientSession] = None
+        settings = get_settings()
+        self.cache_ttl = settings.SEARCH_CACHE_TTL
+        self._cache = MemoryCacheBackend(maxsize=settings.SEARCH_CACHE_SIZE)
         logger.info("Initialized DuckDuckGo search client")
     
     async def search(
@@ -35,33 +133,94 @@ class WebSearchClient:
         Returns:
             List of search results with title, url, snippet
         """
+        # Only the default backend is cached; explicit backends are used to bypass it
+        cache_key = None
+        if backend == "auto":
+            cache_key = hashlib.sha256(
+                f"{query}|{region}|{safesearch}|{max_results}".encode()
+            ).hexdigest()
+            cached = await self._cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Search cache hit: {query}")
+                return [dict(result) for result in cached]
+        
         try:
             logger.info(f"Searching DuckDuckGo: {query}")
             
             results = []
-            search_results = self.ddgs.text(
-                query,
-                region=region,
-                safesearch=safesearch,
-                max_results=max_results,
-                backend=backend
-            )
+            if backend == "auto":
+                results = await self._search_html(query, max_results, region, safesearch)
             
-            for result in search_results:
-                results.append({
-                    "title": result.get("title", ""),
-                    "url": result.get("href", ""),
-                    "snippet": result.get("body", ""),
-                    "source": "duckduckgo"
-                })
+            if not results:
+                # ddgs is synchronous; run it in a worker thread so the event loop stays free
+                search_results = await asyncio.to_thread(
+                    self.ddgs.text,
+                    query,
+                    region=region,
+                    safesearch=safesearch,
+                    max_results=max_results,
+                    backend=backend
+                )
+                
+                for result in search_results:
+                    results.append({
+                        "title": result.get("title", ""),
+                        "url": result.get("href", ""),
+                        "snippet": result.get("body", ""),
+                        "source": "duckduckgo"
+                    })
             
             logger.info(f"Found {len(results)} search results")
+            
+            if cache_key is not None and results:
+                await self._cache.set(cache_key, [dict(result) for result in results], self.cache_ttl)
             return results
             
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {str(e)}")
             return []
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; LearnByDoing/1.0)"}
+            )
+        return self._session
+    
+    async def _search_html(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        safesearch: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the DuckDuckGo HTML endpoint directly.
+        
+        Returns:
+            Search results, or an empty list if the request or parsing failed
+        """
+        data = {"q": query, "kl": region, "kp": DDG_SAFESEARCH.get(safesearch, "-1")}
+        
+        try:
+            async with self._get_session().post(DDG_HTML_URL, data=data) as response:
+                response.raise_for_status()
+                html = await response.text()
+        except Exception as e:
+            logger.warning(f"DuckDuckGo HTML search failed, falling back to ddgs: {str(e)}")
+            return []
+        
+        return parse_html_results(html, max_results)
+    
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
     async def search_documentation(
         self,
         topic: str,
@@ -116,8 +275,16 @@ class WebSearchClient:
         Returns:
             Combined unique results
         """
+        # Drop queries that only differ in word order or case
+        unique_queries = {}
+        for query in queries:
+            unique_queries.setdefault(" ".join(sorted(query.lower().split())), query)
+        if len(unique_queries) < len(queries):
+            logger.debug(f"Skipping {len(queries) - len(unique_queries)} duplicate search queries")
+        queries = list(unique_queries.values())
+        
         all_results = []
-        seen_urls = set()
+        seen_hashes: set[bytes] = set()
         
         for i, query in enumerate(queries):
             try:
@@ -130,8 +297,11 @@ class WebSearchClient:
                 
                 for result in results:
                     url = result.get("url", "")
-                    if url and url not in seen_urls:
-                        seen_urls.add(url)
+                    if not url:
+                        continue
+                    key = url_hash(url)
+                    if key not in seen_hashes:
+                        seen_hashes.add(key)
                         all_results.append(result)
                         
             except Exception as e:
@@ -181,3 +351,9 @@ def get_search_client() -> WebSearchClient:
     if _search_client is None:
         _search_client = WebSearchClient()
     return _search_client
+
+
+async def close_search_client():
+    """Close the search client's HTTP session if it was created."""
+    if _search_client is not None:
+        await _search_client.close()
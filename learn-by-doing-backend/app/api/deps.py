@@ -1,5 +1,7 @@
 """API dependency injection."""
+from fastapi import Request
 from app.db.session import AsyncSessionLocal
+from app.services.validation_service import ResourceValidator
 
 
 async def get_db():
@@ -9,3 +11,8 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def get_validator(request: Request) -> ResourceValidator:
+    """Get the application-wide resource validator."""
+    return request.app.state.validator
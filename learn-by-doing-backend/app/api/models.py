@@ -2,7 +2,7 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ============== Request Models ==============
@@ -19,14 +19,15 @@ class PathGenerationRequest(BaseModel):
         description="Experience level: beginner, intermediate, or advanced"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "topic": "Rust CLI tools",
                 "context": "Want to build system utilities like file organizers",
                 "experience_level": "intermediate"
             }
         }
+    )
 
 
 # ============== Response Models ==============
@@ -91,8 +92,7 @@ class PathGenerationResponse(BaseModel):
     path: LearningPathData
     metadata: GenerationMetadata
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PathListItem(BaseModel):
@@ -108,8 +108,7 @@ class PathListItem(BaseModel):
     qualityScore: Optional[int]
     createdAt: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PathDetail(BaseModel):
@@ -131,8 +130,7 @@ class PathDetail(BaseModel):
     createdAt: datetime
     updatedAt: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ============== Health Check ==============
@@ -143,3 +141,11 @@ class HealthStatus(BaseModel):
     version: str
     database: str
     llm: str
+    llm_cache: Dict[str, int] = Field(default_factory=dict, description="LLM response cache hits and misses")
+
+
+class MigrationStatus(BaseModel):
+    """In-app database migration progress."""
+    mode: str
+    status: str = Field(..., description="not_started, running, completed, or failed")
+    error: Optional[str] = None
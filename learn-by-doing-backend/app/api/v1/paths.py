@@ -1,12 +1,12 @@
 """Path API routes."""
 import time
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_validator
 from app.api.models import (
     PathGenerationRequest,
     PathGenerationResponse,
@@ -16,17 +16,62 @@ from app.api.models import (
     GenerationMetadata
 )
 from app.services.path_service import PathService
+from app.services.validation_service import ResourceValidator
 from app.db.models import LearningPath as LearningPathModel
 from app.core.logging import logger
 
 router = APIRouter()
 
+PATH_CACHE_CONTROL = "private, max-age=60"
+
+
+def _path_etag(path: LearningPathModel) -> str:
+    """Weak ETag for a stored path, changing whenever the row is updated."""
+    changed_at = path.updated_at or path.created_at
+    return f'W/"{path.id}-{changed_at.timestamp() if changed_at else 0}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    The header may list several tags or be "*". Tags are compared weakly,
+    so a W/ prefix on either side is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _not_modified(request: Request, response: Response, path: LearningPathModel) -> Optional[Response]:
+    """
+    Set caching headers and short-circuit when the client's copy is current.
+    
+    Returns:
+        A 304 response if the client sent a matching If-None-Match, else None
+    """
+    etag = _path_etag(path)
+    headers = {"ETag": etag, "Cache-Control": PATH_CACHE_CONTROL}
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return None
+
 
 @router.post("/generate", response_model=PathGenerationResponse)
 async def generate_path(
     request: PathGenerationRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    validator: ResourceValidator = Depends(get_validator)
 ):
     """
     Generate a new learning path using agentic workflow.
@@ -39,23 +84,27 @@ async def generate_path(
     
     The workflow loops until approved or max iterations reached.
     
+    The path is saved in the background after the response is sent, so it
+    can take a moment before it is readable by its id.
+    
     **Note**: This operation takes 30-120 seconds.
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     logger.info(f"Starting path generation for: {request.topic}")
     
     try:
         # Create service and generate
-        service = PathService(db)
+        service = PathService(db, validator)
         result = await service.generate_path(
             topic=request.topic,
             context=request.context,
-            experience_level=request.experience_level
+            experience_level=request.experience_level,
+            wait_for_save=False
         )
         
         # Calculate generation time
-        generation_time = time.time() - start_time
+        generation_time = time.perf_counter() - start_time
         
         # Build response
         response = PathGenerationResponse(
@@ -84,6 +133,8 @@ async def generate_path(
 @router.get("/{path_id}", response_model=PathDetail)
 async def get_path(
     path_id: UUID,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """Get a learning path by ID."""
@@ -93,12 +144,14 @@ async def get_path(
     if not path:
         raise HTTPException(status_code=404, detail="Path not found")
     
-    return path
+    return _not_modified(request, response, path) or path
 
 
 @router.get("/slug/{slug}", response_model=PathDetail)
 async def get_path_by_slug(
     slug: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """Get a learning path by slug."""
@@ -108,13 +161,14 @@ async def get_path_by_slug(
     if not path:
         raise HTTPException(status_code=404, detail="Path not found")
     
-    return path
+    return _not_modified(request, response, path) or path
 
 
 @router.get("/", response_model=list[PathListItem])
 async def list_paths(
     language: Optional[str] = None,
     area: Optional[str] = None,
+    difficulty_level: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
     db: AsyncSession = Depends(get_db)
@@ -125,6 +179,7 @@ async def list_paths(
     Args:
         language: Filter by programming language
         area: Filter by area of focus
+        difficulty_level: Filter by experience level (beginner, intermediate, advanced)
         limit: Maximum results to return
         offset: Pagination offset
     """
@@ -132,6 +187,7 @@ async def list_paths(
     paths = await service.list_paths(
         language=language,
         area=area,
+        difficulty_level=difficulty_level,
         limit=limit,
         offset=offset
     )
@@ -1,4 +1,5 @@
 """Custom exceptions for the application."""
+from typing import Optional
 
 
 class LearnByDoingException(Exception):
@@ -16,6 +17,14 @@ class LLMException(LearnByDoingException):
     pass
 
 
+class RateLimitException(LLMException):
+    """Exception raised when the LLM provider rate limits a request."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class ValidationException(LearnByDoingException):
     """Exception raised during validation."""
     pass
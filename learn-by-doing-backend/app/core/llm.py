@@ -1,31 +1,84 @@
 """OpenRouter API client wrapper (OpenAI-compatible)."""
 import json
 import asyncio
+import random
 import re
-from typing import Any
+import time
+from typing import Any, Callable, Optional
 import httpx
+import pyjson5
+from aiolimiter import AsyncLimiter
+from pydantic_core import from_json
 from app.config import get_settings
-from app.core.exceptions import LLMException
+from app.core.exceptions import LLMException, RateLimitException
 from app.core.logging import logger
+from app.core.serialization import dumps, loads
+
+
+# Ways providers phrase the suggested wait in a rate-limit error
+_RETRY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'retry in ([\d.]+)s',
+        r'retryDelay[^\d]*(\d+)',
+        r'RetryInfo.*?(\d+)s',
+        r'after (\d+) seconds'
+    )
+]
+
+# First fenced code block, with or without a json language tag
+_FENCE_RE = re.compile(r"```(?:json)?(.*?)```", re.DOTALL)
+
+# Appended to every generate_json request
+_JSON_INSTRUCTION = {
+    "role": "system",
+    "content": "Respond ONLY with valid JSON. Do not include any thoughts, explanations, or markdown formatting."
+}
+
+# Used to read the first JSON value from text that continues after it
+_json_decoder = json.JSONDecoder()
 
 
 class OpenRouterClient:
     """Client for OpenRouter API (OpenAI-compatible)."""
     
     BASE_URL = "https://openrouter.ai/api/v1"
+    MAX_RETRY_DELAY = 60.0
     
     def __init__(self):
         settings = get_settings()
         self.api_key = settings.OPENROUTER_API_KEY
         self.model = settings.OPENROUTER_MODEL
         self.base_url = self.BASE_URL
+        self.stream = settings.LLM_STREAMING
+        self.json5_fallbacks = 0
+        # Shared by every workflow in the process, so requests are spaced to
+        # the provider's rate limit instead of each discovering it with a 429
+        self.limiter = AsyncLimiter(max_rate=settings.OPENROUTER_RPM, time_period=60)
+        self._paused_until = 0.0
+        # One pooled client for all calls so keep-alive connections (and
+        # their TLS sessions) are reused instead of renegotiated per request
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://learnbydoing.local",  # Optional
+                "X-Title": "LearnByDoing Backend",  # Optional
+            },
+            timeout=120.0,  # Increased timeout for slow models
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+        )
         logger.info(f"Initialized OpenRouter client with model: {self.model}")
     
     async def generate(
         self,
         messages: list[dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        stream: Optional[bool] = None,
+        on_partial: Optional[Callable[[dict[str, Any]], bool]] = None
     ) -> str:
         """
         Generate text using OpenRouter API.
@@ -34,41 +87,44 @@ class OpenRouterClient:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            stream: Receive the completion as server-sent events (defaults to
+                the LLM_STREAMING setting)
+            on_partial: Called with the partially parsed JSON object as it
+                streams in (only when streaming); returns True once it needs
+                no further updates
         
         Returns:
             Generated text response
         """
+        if stream is None:
+            stream = self.stream
+        
+        # Encoded with orjson; the client already sends the JSON content type
+        request = {
+            "content": dumps({
+                "model": self.model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": stream
+            })
+        }
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://learnbydoing.local",  # Optional
-                        "X-Title": "LearnByDoing Backend",  # Optional
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": temperature,
-                        "max_tokens": max_tokens
-                    },
-                    timeout=120.0  # Increased timeout for slow models
-                )
-                
-                if response.status_code == 429:
-                    error_data = response.json()
-                    logger.error(f"Rate limit error: {error_data}")
-                    raise LLMException(f"429 RATE_LIMITED: {error_data}")
-                
-                response.raise_for_status()
-                data = response.json()
-                
+            await self._wait_for_rate_limit()
+            if stream:
+                content = await self._generate_stream(request, on_partial)
+            else:
+                response = await self.client.post("/chat/completions", **request)
+                self._check_response(response)
+                data = loads(response.content)
                 content = data["choices"][0]["message"]["content"]
-                logger.debug(f"OpenRouter response received, length: {len(content)}")
-                return content
-                
+            
+            logger.debug(f"OpenRouter response received, length: {len(content)}")
+            return content
+            
+        except LLMException:
+            raise
         except httpx.ConnectError as e:
             logger.error(f"OpenRouter connection error: {str(e)}")
             raise LLMException(f"CONNECTION_ERROR: {str(e)}")
@@ -85,11 +141,111 @@ class OpenRouterClient:
             logger.error(f"OpenRouter API error: {str(e)}")
             raise LLMException(f"Failed to generate response: {str(e)}")
     
+    async def _generate_stream(
+        self,
+        request: dict[str, Any],
+        on_partial: Optional[Callable[[dict[str, Any]], bool]] = None
+    ) -> str:
+        """
+        Receive a completion as server-sent events and join the deltas.
+        
+        The request timeout then applies to each chunk rather than the whole
+        completion, so long generations don't time out and a stalled
+        connection is noticed without waiting for the full body.
+        """
+        parts = []
+        async with self.client.stream("POST", "/chat/completions", **request) as response:
+            if response.status_code >= 400:
+                await response.aread()
+            self._check_response(response)
+            
+            async for line in response.aiter_lines():
+                # Skip keep-alive comments and blank event separators
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                
+                chunk = loads(data)
+                if "error" in chunk:
+                    raise LLMException(f"Stream error: {chunk['error']}")
+                
+                choices = chunk.get("choices")
+                if choices:
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        # A closing bracket is the only point where a new value
+                        # completes; each parse covers the whole buffer, so stop
+                        # once the callback has what it needs
+                        if on_partial is not None and ("}" in delta or "]" in delta):
+                            if self._emit_partial("".join(parts), on_partial):
+                                on_partial = None
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _emit_partial(text: str, on_partial: Callable[[dict[str, Any]], bool]) -> bool:
+        """
+        Parse the JSON object streamed so far and hand it to the callback.
+        
+        Returns:
+            True if the callback wants no further updates
+        """
+        start = text.find("{")
+        if start == -1:
+            return False
+        
+        try:
+            parsed = from_json(text[start:], allow_partial=True)
+        except ValueError:
+            return False
+        
+        if isinstance(parsed, dict):
+            return bool(on_partial(parsed))
+        return False
+    
+    async def _wait_for_rate_limit(self):
+        """Wait out a server-requested pause, then take a slot from the limiter."""
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            logger.info(f"Rate limited by provider, waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+        await self.limiter.acquire()
+    
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        await self.client.aclose()
+    
+    def _check_response(self, response: httpx.Response):
+        """Raise for rate limiting and HTTP errors."""
+        if response.status_code == 429:
+            error_data = loads(response.content)
+            logger.error(f"Rate limit error: {error_data}")
+            
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass  # Missing, or an HTTP date; fall back to the error body
+            else:
+                # Hold back every caller, not just this one, until the window reopens
+                self._paused_until = max(
+                    self._paused_until,
+                    time.monotonic() + min(retry_after, self.MAX_RETRY_DELAY)
+                )
+            raise RateLimitException(f"429 RATE_LIMITED: {error_data}", retry_after=retry_after)
+        
+        response.raise_for_status()
+    
     async def generate_json(
         self,
         messages: list[dict[str, str]],
         temperature: float = 0.3,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        stream: Optional[bool] = None,
+        on_partial: Optional[Callable[[dict[str, Any]], bool]] = None
     ) -> dict[str, Any]:
         """
         Generate JSON response using OpenRouter API.
@@ -98,56 +254,39 @@ class OpenRouterClient:
             messages: List of message dicts
             temperature: Sampling temperature
             max_tokens: Maximum tokens
+            stream: Receive the completion as server-sent events
+            on_partial: Called with the partially parsed object while streaming;
+                returns True once it needs no further updates
         
         Returns:
             Parsed JSON dict
         """
         response = ""
         try:
-            # Add JSON instruction to the last user message
-            json_messages = messages.copy()
-            if json_messages and json_messages[-1]["role"] == "user":
-                json_messages[-1]["content"] += "\n\nRespond ONLY with valid JSON. Do not include any thoughts, explanations, or markdown formatting."
+            # Finish with the JSON instruction instead of rewriting the last message
+            json_messages = [*messages, _JSON_INSTRUCTION]
             
             response = await self.generate_with_retry(
                 messages=json_messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                stream=stream,
+                on_partial=on_partial
             )
             
             # Log raw response before processing
             logger.debug(f"Raw response for JSON parsing: {response[:500]}")
             
             # Clean up the response - extract JSON from markdown or text
-            response = response.strip()
+            match = _FENCE_RE.search(response)
+            if match:
+                response = match.group(1)
             
-            # Try to find JSON between code blocks
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                if end != -1:
-                    response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                if end != -1:
-                    response = response[start:end].strip()
-            
-            # Try to find JSON between curly braces if still not valid
-            if not response.startswith("{"):
-                start = response.find("{")
-                if start != -1:
-                    brace_count = 0
-                    end = start
-                    for i, char in enumerate(response[start:]):
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end = start + i + 1
-                                break
-                    response = response[start:end]
+            # Skip any text before the JSON object (including an unclosed
+            # fence); text after it is handled by the parser
+            start = response.find("{")
+            if start > 0:
+                response = response[start:]
             
             response = response.strip()
             
@@ -157,7 +296,7 @@ class OpenRouterClient:
             if not response:
                 raise LLMException("Empty response after cleaning")
             
-            return json.loads(response)
+            return self._parse_json(response)
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
@@ -168,17 +307,54 @@ class OpenRouterClient:
             logger.error(f"JSON generation error: {str(e)}")
             raise
     
+    def _parse_json(self, text: str) -> dict[str, Any]:
+        """
+        Parse LLM JSON output, tolerating common model mistakes.
+        
+        Strict JSON is tried first, then the first complete object with any
+        trailing text ignored, then JSON5 (trailing commas, single quotes,
+        unquoted keys), then a partial parse for responses truncated at
+        max_tokens. Only ever used on model output.
+        
+        Args:
+            text: Cleaned response text
+        
+        Returns:
+            Parsed JSON dict
+        """
+        try:
+            return loads(text)
+        except json.JSONDecodeError as e:
+            try:
+                parsed, end = _json_decoder.raw_decode(text)
+            except json.JSONDecodeError:
+                pass
+            else:
+                logger.debug(f"Ignored {len(text) - end} chars after the JSON object")
+                return parsed
+            
+            try:
+                parsed = pyjson5.loads(text)
+            except pyjson5.Json5Exception:
+                pass
+            else:
+                self.json5_fallbacks += 1
+                logger.warning(f"Parsed LLM response with JSON5 fallback (count={self.json5_fallbacks})")
+                return parsed
+            
+            try:
+                # Closes unterminated containers and keeps a trailing partial string
+                parsed = from_json(text, allow_partial="trailing-strings")
+            except ValueError:
+                raise e
+            
+            logger.warning(f"Recovered truncated JSON response ({len(text)} chars)")
+            return parsed
+    
     def _extract_retry_delay(self, error_message: str) -> float:
         """Extract retry delay from error message."""
-        patterns = [
-            r'retry in ([\d.]+)s',
-            r'retryDelay[^\d]*(\d+)',
-            r'RetryInfo.*?(\d+)s',
-            r'after (\d+) seconds'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, error_message, re.IGNORECASE)
+        for pattern in _RETRY_PATTERNS:
+            match = pattern.search(error_message)
             if match:
                 try:
                     delay = float(match.group(1))
@@ -205,20 +381,44 @@ class OpenRouterClient:
                 last_error = e
                 error_str = str(e)
                 
+                # Delays are jittered so concurrent workflows that failed
+                # together don't all retry at the same instant
                 if "CONNECTION_ERROR" in error_str or "TIMEOUT_ERROR" in error_str:
-                    # Connection errors - retry immediately with short delay
-                    retry_delay = min(2 ** attempt, 10)  # Max 10 seconds
-                    logger.warning(f"Connection error. Waiting {retry_delay}s before retry {attempt + 1}/{max_retries}")
+                    # Connection errors - retry quickly with a short delay
+                    retry_delay = random.uniform(0, min(2 ** attempt, 10))  # Max 10 seconds
+                    logger.warning(f"Connection error. Waiting {retry_delay:.1f}s before retry {attempt + 1}/{max_retries}")
                     await asyncio.sleep(retry_delay)
                 elif "429" in error_str or "RATE_LIMITED" in error_str:
-                    retry_delay = self._extract_retry_delay(error_str)
-                    logger.warning(f"Rate limit hit (429). Waiting {retry_delay}s before retry {attempt + 1}/{max_retries}")
+                    if isinstance(e, RateLimitException) and e.retry_after is not None:
+                        retry_delay = e.retry_after
+                    else:
+                        retry_delay = self._extract_retry_delay(error_str)
+                    retry_delay = min(retry_delay, self.MAX_RETRY_DELAY) + random.uniform(0, 1)
+                    logger.warning(f"Rate limit hit (429). Waiting {retry_delay:.1f}s before retry {attempt + 1}/{max_retries}")
                     await asyncio.sleep(retry_delay)
                 elif attempt < max_retries - 1:
-                    backoff = min(2 ** attempt, 30)  # Cap at 30 seconds
-                    logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}. Retrying in {backoff}s")
+                    backoff = random.uniform(0, min(2 ** attempt, 30))  # Cap at 30 seconds
+                    logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}. Retrying in {backoff:.1f}s")
                     await asyncio.sleep(backoff)
                 else:
                     logger.error(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
         
         raise LLMException(f"Failed after {max_retries} attempts: {str(last_error)}")
+
+
+# Singleton instance
+_llm_client = None
+
+
+def get_llm_client() -> OpenRouterClient:
+    """Get or create the shared LLM client."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = OpenRouterClient()
+    return _llm_client
+
+
+async def close_llm_client():
+    """Close the shared LLM client if it was created."""
+    if _llm_client is not None:
+        await _llm_client.aclose()
@@ -0,0 +1,151 @@
+"""Response cache for LLM calls."""
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Protocol
+from app.config import get_settings
+from app.core.logging import logger
+from app.core.serialization import dumps
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache."""
+    
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+    
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        ...
+    
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache backend with per-entry expiry."""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class LLMCache:
+    """Exact-match cache of LLM responses keyed by the request."""
+    
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl_seconds: int = 3600):
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def cache_key(
+        model: str,
+        messages: list[dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Hash the parts of a request that determine the response."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        return hashlib.sha256(dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts since startup."""
+        return {"hits": self.hits, "misses": self.misses}
+    
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(key, value, self.ttl_seconds)
+    
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+class CachingLLMClient:
+    """
+    LLM client wrapper that serves repeated JSON requests from a cache.
+    
+    Responses are copied in and out of the cache because agents annotate
+    the dicts they get back.
+    """
+    
+    def __init__(self, client: Any, cache: LLMCache):
+        self.client = client
+        self.cache = cache
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+    
+    async def generate_json(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float = 0.3,
+        max_tokens: int = 4000,
+        **kwargs
+    ) -> dict[str, Any]:
+        """Generate JSON, reusing the response to an identical earlier request."""
+        key = self.cache.cache_key(self.client.model, messages, temperature, max_tokens)
+        
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info("LLM cache hit")
+            return copy.deepcopy(cached)
+        
+        response = await self.client.generate_json(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        await self.cache.set(key, copy.deepcopy(response))
+        return response
+
+
+# Singleton instance
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the shared LLM response cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        settings = get_settings()
+        _llm_cache = LLMCache(
+            backend=MemoryCacheBackend(maxsize=settings.LLM_CACHE_SIZE),
+            ttl_seconds=settings.LLM_CACHE_TTL
+        )
+    return _llm_cache
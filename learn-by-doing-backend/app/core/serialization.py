@@ -0,0 +1,33 @@
+"""JSON serialization helpers."""
+from typing import Any
+import orjson
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Serialize an object to a JSON string using orjson.
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation (for logs, not prompts)
+        sort_keys: Emit keys in sorted order
+    
+    Returns:
+        JSON string
+    """
+    option = 0
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, option=option).decode()
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Parse a JSON string using orjson.
+    
+    Raises:
+        orjson.JSONDecodeError: a subclass of json.JSONDecodeError
+    """
+    return orjson.loads(data)
@@ -0,0 +1,46 @@
+"""Run Alembic migrations from inside the application."""
+import asyncio
+import os
+from typing import Any
+from alembic import command
+from alembic.config import Config
+from app.core.logging import logger
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Progress of the in-app migration run, reported by /health/migrations
+migration_status: dict[str, Any] = {"status": "not_started", "error": None}
+
+
+def run_migrations():
+    """Upgrade the database to the latest revision."""
+    # Built without alembic.ini so env.py doesn't call fileConfig() and
+    # replace the application's logging setup
+    alembic_cfg = Config()
+    alembic_cfg.set_main_option("script_location", os.path.join(BASE_DIR, "alembic"))
+    command.upgrade(alembic_cfg, "head")
+
+
+async def run_migrations_async(raise_on_error: bool = False):
+    """
+    Upgrade the database without blocking the event loop.
+    
+    alembic/env.py drives its AsyncEngine through asyncio.run(), so the
+    upgrade runs in a worker thread with its own event loop.
+    
+    Args:
+        raise_on_error: Re-raise a failed upgrade after recording it, so
+            a startup that waits for the migrations aborts
+    """
+    migration_status.update(status="running", error=None)
+    logger.info("Running database migrations")
+    
+    try:
+        await asyncio.to_thread(run_migrations)
+        migration_status["status"] = "completed"
+        logger.info("Database migrations complete")
+    except Exception as e:
+        migration_status.update(status="failed", error=str(e))
+        logger.error(f"Database migrations failed: {str(e)}")
+        if raise_on_error:
+            raise
@@ -1,8 +1,8 @@
 """Database models."""
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, String, Integer, DateTime, JSON, func, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Text, DateTime, func, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -11,13 +11,36 @@ Base = declarative_base()
 class LearningPath(Base):
     """Learning path model."""
     __tablename__ = "learning_paths"
+    __table_args__ = (
+        # Named explicitly so they match the migrations; slug is covered by
+        # its unique index.
+        Index("idx_paths_language", "language"),
+        Index("idx_paths_area", "area"),
+        Index("idx_paths_status", "status"),
+        Index("idx_paths_difficulty", "difficulty_level"),
+        Index(
+            "idx_paths_raw_gin", "raw_data",
+            postgresql_using="gin",
+            postgresql_ops={"raw_data": "jsonb_path_ops"}
+        ),
+        # Newest active paths, optionally by language or area (list_paths)
+        Index("idx_paths_active_created", "created_at", postgresql_where=text("status = 'active'")),
+        Index(
+            "idx_paths_active_language_created", "language", "created_at",
+            postgresql_where=text("status = 'active'")
+        ),
+        Index(
+            "idx_paths_active_area_created", "area", "created_at",
+            postgresql_where=text("status = 'active'")
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     slug = Column(String(100), unique=True, nullable=False, index=True)
     title = Column(String(200), nullable=False)
     description = Column(String(2000))
-    language = Column(String(100), index=True)
-    area = Column(String(100), index=True)
+    language = Column(String(100))
+    area = Column(String(100))
     version = Column(String(50))
     
     # Statistics
@@ -26,10 +49,10 @@ class LearningPath(Base):
     difficulty_level = Column(String(20))
     
     # Full data
-    raw_data = Column(JSON, nullable=False)
+    raw_data = Column(JSONB, nullable=False)
     
     # Generation metadata
-    generation_metadata = Column(JSON, default=dict)
+    generation_metadata = Column(JSONB, default=dict)
     quality_score = Column(Integer)  # 0-100
     generation_attempts = Column(Integer, default=1)
     
@@ -60,7 +83,7 @@ class Phase(Base):
     description = Column(String(1000))
     
     # Raw data
-    raw_data = Column(JSON)
+    raw_data = Column(JSONB)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -76,6 +99,11 @@ class Phase(Base):
 class Task(Base):
     """Task model."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        UniqueConstraint("path_id", "task_id", name="uq_tasks_path_task"),
+        Index("idx_tasks_path_phase", "path_id", "phase_id"),
+        Index("idx_tasks_phase_task_id", "phase_id", "task_id", unique=True),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     path_id = Column(UUID(as_uuid=True), ForeignKey("learning_paths.id", ondelete="CASCADE"))
@@ -89,13 +117,11 @@ class Task(Base):
     estimated_hours = Column(Integer)
     
     # Structured data
-    requirements = Column(JSON, default=list)
-    acceptance_criteria = Column(JSON, default=list)
-    prerequisites = Column(JSON, default=list)
-    resources = Column(JSON, default=list)
+    prerequisites = Column(JSONB, default=list)
+    resources = Column(JSONB, default=list)
     
     # Raw data
-    raw_data = Column(JSON)
+    raw_data = Column(JSONB)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -103,11 +129,45 @@ class Task(Base):
     # Relationships
     path = relationship("LearningPath", back_populates="tasks")
     phase = relationship("Phase", back_populates="tasks")
+    requirements = relationship(
+        "TaskRequirement",
+        order_by="TaskRequirement.order_index",
+        cascade="all, delete-orphan"
+    )
+    acceptance_criteria = relationship(
+        "TaskAcceptanceCriterion",
+        order_by="TaskAcceptanceCriterion.order_index",
+        cascade="all, delete-orphan"
+    )
     
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title})>"
 
 
+class TaskRequirement(Base):
+    """Single requirement of a task."""
+    __tablename__ = "task_requirements"
+    
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    order_index = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    
+    def __repr__(self):
+        return f"<TaskRequirement(task_id={self.task_id}, order_index={self.order_index})>"
+
+
+class TaskAcceptanceCriterion(Base):
+    """Single acceptance criterion of a task."""
+    __tablename__ = "task_acceptance_criteria"
+    
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    order_index = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    
+    def __repr__(self):
+        return f"<TaskAcceptanceCriterion(task_id={self.task_id}, order_index={self.order_index})>"
+
+
 class GenerationJob(Base):
     """Track generation jobs."""
     __tablename__ = "generation_jobs"
@@ -122,7 +182,7 @@ class GenerationJob(Base):
     
     # Results
     path_id = Column(UUID(as_uuid=True), ForeignKey("learning_paths.id"), nullable=True)
-    result_data = Column(JSON)
+    result_data = Column(JSONB)
     error_message = Column(String(1000))
     
     # Progress
@@ -137,3 +197,24 @@ class GenerationJob(Base):
     
     def __repr__(self):
         return f"<GenerationJob(id={self.id}, topic={self.topic}, status={self.status})>"
+
+
+class AgentLog(Base):
+    """Agent action recorded during a generation job."""
+    __tablename__ = "agent_logs"
+    __table_args__ = (
+        Index("idx_agent_logs_job_id", "job_id"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("generation_jobs.id", ondelete="CASCADE"), nullable=False)
+    agent = Column(String(50), nullable=False)
+    action = Column(String(200), nullable=False)
+    iteration = Column(Integer, default=0)
+    details = Column(JSONB)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<AgentLog(job_id={self.job_id}, agent={self.agent}, action={self.action})>"
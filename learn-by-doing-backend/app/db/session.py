@@ -1,6 +1,7 @@
 """Database session management."""
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.config import get_settings
+from app.core.serialization import dumps, loads
 
 settings = get_settings()
 
@@ -8,7 +9,17 @@ settings = get_settings()
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
-    future=True
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    # Check connections on checkout so ones dropped while idle are replaced
+    # instead of failing the request
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    # JSON columns are encoded and decoded with orjson
+    json_serializer=dumps,
+    json_deserializer=loads
 )
 
 # Create async session factory
@@ -1,12 +1,21 @@
 """Main FastAPI application."""
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
 from app.api.v1 import api_router
+from app.agents.tools import close_search_client
+from app.core.llm import close_llm_client
+from app.core.llm_cache import get_llm_cache
 from app.core.logging import logger
-from app.api.models import HealthStatus
+from app.api.models import HealthStatus, MigrationStatus
+from app.db.migrations import migration_status, run_migrations_async
+from app.services.path_service import wait_for_pending_saves
+from app.services.validation_service import ResourceValidator
+from app.workflow.graph import get_workflow
 
 settings = get_settings()
 
@@ -15,7 +24,29 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     logger.info(f"Starting {settings.PROJECT_NAME}")
+    
+    migration_task = None
+    if settings.MIGRATION_MODE == "sync":
+        # Don't serve requests against an outdated schema
+        await run_migrations_async(raise_on_error=True)
+    elif settings.MIGRATION_MODE == "async":
+        # Serve health checks while the schema is being upgraded
+        migration_task = asyncio.create_task(run_migrations_async())
+    
+    # Shared by all requests so its connection pool is reused
+    app.state.validator = ResourceValidator()
+    
+    # Build the agents and compile the graph before the first request
+    get_workflow()
+    
     yield
+    
+    if migration_task is not None and not migration_task.done():
+        logger.warning("Shutting down while database migrations are still running")
+    await wait_for_pending_saves()
+    await app.state.validator.close()
+    await close_search_client()
+    await close_llm_client()
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
 
 
@@ -24,6 +55,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Agentic backend for generating custom learning paths",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -50,10 +82,17 @@ async def health_check():
         status="healthy",
         version="1.0.0",
         database="connected",
-        llm="available" if settings.OPENROUTER_API_KEY else "not_configured"
+        llm="available" if settings.OPENROUTER_API_KEY else "not_configured",
+        llm_cache=get_llm_cache().stats()
     )
 
 
+@app.get("/health/migrations", response_model=MigrationStatus)
+async def migration_health():
+    """In-app database migration status."""
+    return MigrationStatus(mode=settings.MIGRATION_MODE, **migration_status)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
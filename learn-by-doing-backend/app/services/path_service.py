@@ -1,43 +1,182 @@
 """Path service - business logic for learning paths."""
+import asyncio
+import hashlib
 from typing import Optional, List, Dict, Any
-from uuid import UUID
-from datetime import datetime
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from slugify import slugify
 
-from app.db.models import LearningPath, Phase, Task
+from app.db.session import AsyncSessionLocal
+from app.db.models import (
+    LearningPath, Phase, Task, TaskRequirement, TaskAcceptanceCriterion,
+    GenerationJob, AgentLog
+)
 from app.workflow.graph import get_workflow
 from app.workflow.state import create_initial_state
 from app.services.validation_service import ResourceValidator
 from app.core.logging import logger
 from app.config import get_settings
+from app.core.serialization import dumps
+
+# Keys stored in dedicated columns/tables; kept out of the per-row raw_data
+# so each row doesn't carry a second JSON copy of them.
+PHASE_COLUMN_KEYS = frozenset({"id", "order", "title", "description", "tasks"})
+TASK_COLUMN_KEYS = frozenset({
+    "id", "phaseId", "title", "description", "difficulty", "estimatedHours",
+    "requirements", "acceptanceCriteria", "prerequisites", "resources"
+})
+
+# Columns refreshed when a task is saved again for the same path
+TASK_UPSERT_COLUMNS = (
+    "phase_id", "title", "description", "difficulty", "estimated_hours",
+    "prerequisites", "resources", "raw_data"
+)
+
+
+# Generations in progress, keyed by request, so identical concurrent
+# requests share one workflow run
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Saves of generated paths, keyed by path id, kept until they finish
+_pending_saves: Dict[UUID, asyncio.Task] = {}
+
+
+def _track(tasks: Dict[Any, asyncio.Task], key: Any, task: asyncio.Task):
+    """Keep a task referenced until it finishes, then forget it."""
+    def done(task: asyncio.Task):
+        tasks.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved in case nobody awaited it
+    
+    tasks[key] = task
+    task.add_done_callback(done)
+
+
+async def wait_for_pending_saves():
+    """Wait for the saves of already generated paths to finish."""
+    if _pending_saves:
+        await asyncio.gather(*_pending_saves.values(), return_exceptions=True)
+
+
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    """Cut request text down to its column's length."""
+    return value[:length] if value else value
+
+
+def _task_id(
+    task_data: Dict[str, Any],
+    phase_data: Dict[str, Any],
+    index: int,
+    taken: Dict[str, Any]
+) -> str:
+    """
+    Pick the id a task is stored under.
+    
+    Task ids are unique within a path, so a missing id is derived from the
+    phase and a repeated one gets a numeric suffix instead of replacing
+    the earlier task.
+    
+    Args:
+        task_data: Task as generated
+        phase_data: Phase the task belongs to
+        index: 1-based position of the task in its phase
+        taken: Task ids already used in the path
+    
+    Returns:
+        Task id that is not in taken
+    """
+    task_id = task_data.get("id")
+    if not task_id:
+        task_id = f"{phase_data.get('id') or 'phase'}-task-{index}"
+        logger.warning(f"Task {index} of phase {phase_data.get('id')} has no id, using {task_id}")
+    
+    if task_id in taken:
+        suffix = 2
+        while f"{task_id}-{suffix}" in taken:
+            suffix += 1
+        logger.warning(f"Duplicate task id {task_id}, saving it as {task_id}-{suffix}")
+        task_id = f"{task_id}-{suffix}"
+    
+    return task_id
+
+
+def _extra_fields(data: Dict[str, Any], column_keys: frozenset) -> Dict[str, Any]:
+    """Return the fields of data that have no dedicated column."""
+    return {key: value for key, value in data.items() if key not in column_keys}
 
 
 class PathService:
     """Service for learning path operations."""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, validator: Optional[ResourceValidator] = None):
         self.db = db
-        self.validator = ResourceValidator()
+        self.validator = validator
     
     async def generate_path(
         self,
         topic: str,
         context: Optional[str] = None,
-        experience_level: str = "intermediate"
+        experience_level: str = "intermediate",
+        wait_for_save: bool = True
     ) -> Dict[str, Any]:
         """
         Generate a learning path using the agentic workflow.
         
+        Identical concurrent requests share one run, which saves the path
+        once. The run is a task of its own, so a caller that goes away
+        doesn't cancel it for the others.
+        
         Args:
             topic: Topic to generate path for
             context: Additional context
             experience_level: Experience level
+            wait_for_save: Return only once the path is saved. When False the
+                path is saved in the background after returning, and a failed
+                save is recorded as a failed generation job.
         
         Returns:
             Dictionary with path data and metadata
         """
+        key = hashlib.sha256(dumps([topic, context, experience_level]).encode()).hexdigest()
+        
+        task = _inflight.get(key)
+        if task is not None:
+            logger.info(f"Joining in-flight generation for: {topic}")
+        else:
+            task = asyncio.create_task(self._generate_and_save(topic, context, experience_level))
+            _track(_inflight, key, task)
+        
+        result = await asyncio.shield(task)
+        
+        save = _pending_saves.get(result["path_id"])
+        if wait_for_save and save is not None:
+            await asyncio.shield(save)
+        return result
+    
+    async def _generate_and_save(
+        self,
+        topic: str,
+        context: Optional[str],
+        experience_level: str
+    ) -> Dict[str, Any]:
+        """Run one generation and start saving its path."""
+        result = await self._generate(topic, context, experience_level)
+        save = asyncio.create_task(
+            self.persist_path(result["path_id"], result["path_data"], result["final_state"])
+        )
+        _track(_pending_saves, result["path_id"], save)
+        return result
+    
+    async def _generate(
+        self,
+        topic: str,
+        context: Optional[str],
+        experience_level: str
+    ) -> Dict[str, Any]:
+        """Run the workflow and resource validation for one request."""
         logger.info(f"Generating path for: {topic}")
         
         # Create initial state
@@ -65,13 +204,14 @@ class PathService:
             if settings.VALIDATE_RESOURCES:
                 await self._validate_path_resources(path_data)
             
-            # Save to database
-            path_id = await self._save_path(path_data, final_state)
+            # The id is assigned up front so it can be returned before the path is saved
+            path_id = uuid4()
             
             # Build response
             result = {
                 "path_id": path_id,
                 "path_data": path_data,
+                "final_state": final_state,
                 "iteration_count": final_state.get("iteration", 0),
                 "quality_score": final_state.get("quality_review", {}).get("score", 0),
                 "approved": final_state.get("approved", False),
@@ -98,14 +238,74 @@ class PathService:
         
         if resources_to_validate:
             logger.info(f"Validating {len(resources_to_validate)} resources")
-            await self.validator.validate_batch(resources_to_validate)
+            if self.validator is not None:
+                await self.validator.validate_batch(resources_to_validate)
+            else:
+                async with ResourceValidator() as validator:
+                    await validator.validate_batch(resources_to_validate)
+    
+    @staticmethod
+    async def persist_path(
+        path_id: UUID,
+        path_data: Dict[str, Any],
+        final_state: Dict[str, Any]
+    ):
+        """
+        Save a generated path in a session of its own.
+        
+        Runs as a task independent of any request, whose session may
+        already be closed.
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                await PathService(db)._save_path(path_data, final_state, path_id)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Failed to save path {path_id}: {str(e)}")
+                await PathService._record_failed_save(path_id, final_state, e)
+                raise
+    
+    @staticmethod
+    async def _record_failed_save(
+        path_id: UUID,
+        final_state: Dict[str, Any],
+        error: Exception
+    ):
+        """
+        Record a path that could not be saved as a failed generation job.
+        
+        The path id was already returned to the client, so the failure is
+        kept in the database rather than only in the logs. The job cannot
+        reference the missing path, so its id goes into result_data.
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                db.add(GenerationJob(
+                    topic=_clip(final_state.get("topic"), 200) or "",
+                    context=_clip(final_state.get("context"), 1000),
+                    experience_level=_clip(final_state.get("experience_level"), 20),
+                    status="failed",
+                    result_data={"path_id": str(path_id)},
+                    error_message=_clip(str(error), 1000),
+                    iteration=final_state.get("iteration", 0),
+                    max_iterations=get_settings().MAX_ITERATIONS,
+                    started_at=final_state.get("started_at"),
+                    completed_at=datetime.now(timezone.utc)
+                ))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Failed to record failed save of path {path_id}: {str(e)}")
     
     async def _save_path(
         self,
         path_data: Dict[str, Any],
-        final_state: Dict[str, Any]
+        final_state: Dict[str, Any],
+        path_id: Optional[UUID] = None
     ) -> UUID:
-        """Save path to database."""
+        """Save path to database. Saving an already stored path id is a no-op."""
+        path_id = path_id or uuid4()
+        
         # Create slug
         base_slug = slugify(path_data.get("id", "unnamed-path"))
         slug = await self._ensure_unique_slug(base_slug)
@@ -113,8 +313,9 @@ class PathService:
         # Extract metadata
         quality_review = final_state.get("quality_review", {})
         
-        # Create learning path
-        path = LearningPath(
+        # Create learning path, unless this id was saved already
+        stmt = pg_insert(LearningPath).values(
+            id=path_id,
             slug=slug,
             title=path_data.get("title", "Untitled Path"),
             description=path_data.get("description", ""),
@@ -123,9 +324,10 @@ class PathService:
             version=path_data.get("version", "1.0"),
             total_tasks=path_data.get("totalTasks", 0),
             estimated_hours=path_data.get("estimatedHours", 0),
+            difficulty_level=_clip(final_state.get("experience_level"), 20),
             raw_data=path_data,
             generation_metadata={
-                "generation_timestamp": datetime.utcnow().isoformat(),
+                "generation_timestamp": datetime.now(timezone.utc).isoformat(),
                 "topic": final_state.get("topic"),
                 "context": final_state.get("context"),
                 "experience_level": final_state.get("experience_level"),
@@ -135,60 +337,153 @@ class PathService:
             },
             quality_score=int(quality_review.get("score", 0) * 100),
             generation_attempts=final_state.get("iteration", 1)
-        )
-        
-        self.db.add(path)
-        await self.db.flush()  # Get the ID
+        ).on_conflict_do_nothing(index_elements=["id"]).returning(LearningPath.id)
+        if (await self.db.execute(stmt)).scalar_one_or_none() is None:
+            await self.db.rollback()
+            return path_id
         
-        # Create phases and tasks
+        # Collect phases and tasks; phase ids are assigned here so each table
+        # is written with a single statement
+        phase_rows: List[Dict[str, Any]] = []
+        task_rows: Dict[str, Dict[str, Any]] = {}
+        task_items: Dict[str, Dict[Any, List[str]]] = {}
         for phase_data in path_data.get("phases", []):
-            phase = Phase(
-                path_id=path.id,
-                phase_id=phase_data.get("id", ""),
-                order_index=phase_data.get("order", 0),
-                title=phase_data.get("title", "Untitled Phase"),
-                description=phase_data.get("description", ""),
-                raw_data=phase_data
-            )
-            self.db.add(phase)
-            await self.db.flush()
+            phase_id = uuid4()
+            phase_rows.append({
+                "id": phase_id,
+                "path_id": path_id,
+                "phase_id": phase_data.get("id", ""),
+                "order_index": phase_data.get("order", 0),
+                "title": phase_data.get("title", "Untitled Phase"),
+                "description": phase_data.get("description", ""),
+                "raw_data": _extra_fields(phase_data, PHASE_COLUMN_KEYS)
+            })
             
-            # Create tasks for this phase
-            for task_data in phase_data.get("tasks", []):
-                task = Task(
-                    path_id=path.id,
-                    phase_id=phase.id,
-                    task_id=task_data.get("id", ""),
-                    title=task_data.get("title", "Untitled Task"),
-                    description=task_data.get("description", ""),
-                    difficulty=task_data.get("difficulty", 3),
-                    estimated_hours=task_data.get("estimatedHours", 4),
-                    requirements=task_data.get("requirements", []),
-                    acceptance_criteria=task_data.get("acceptanceCriteria", []),
-                    prerequisites=task_data.get("prerequisites", []),
-                    resources=task_data.get("resources", []),
-                    raw_data=task_data
-                )
-                self.db.add(task)
+            # Collect tasks for this phase, keyed by task id
+            for index, task_data in enumerate(phase_data.get("tasks", []), start=1):
+                task_id = _task_id(task_data, phase_data, index, task_rows)
+                task_rows[task_id] = {
+                    "path_id": path_id,
+                    "phase_id": phase_id,
+                    "task_id": task_id,
+                    "title": task_data.get("title", "Untitled Task"),
+                    "description": task_data.get("description", ""),
+                    "difficulty": task_data.get("difficulty", 3),
+                    "estimated_hours": task_data.get("estimatedHours", 4),
+                    "prerequisites": task_data.get("prerequisites", []),
+                    "resources": task_data.get("resources", []),
+                    "raw_data": _extra_fields(task_data, TASK_COLUMN_KEYS)
+                }
+                task_items[task_id] = {
+                    TaskRequirement: task_data.get("requirements", []),
+                    TaskAcceptanceCriterion: task_data.get("acceptanceCriteria", [])
+                }
+        
+        if phase_rows:
+            await self.db.execute(insert(Phase), phase_rows)
+        await self._upsert_tasks(task_rows, task_items)
+        
+        # The job record is bookkeeping; failing to write it must not lose the path
+        try:
+            async with self.db.begin_nested():
+                await self._save_job(path_id, final_state)
+        except Exception as e:
+            logger.warning(f"Failed to record generation job for path {path_id}: {str(e)}")
         
         await self.db.commit()
-        logger.info(f"Saved path to database: {path.id}")
+        logger.info(f"Saved path to database: {path_id}")
+        
+        return path_id
+    
+    async def _save_job(self, path_id: UUID, final_state: Dict[str, Any]):
+        """Record the generation job and its agent logs."""
+        job = GenerationJob(
+            topic=_clip(final_state.get("topic"), 200),
+            context=_clip(final_state.get("context"), 1000),
+            experience_level=_clip(final_state.get("experience_level"), 20),
+            status="completed",
+            path_id=path_id,
+            iteration=final_state.get("iteration", 0),
+            max_iterations=get_settings().MAX_ITERATIONS,
+            started_at=final_state.get("started_at"),
+            completed_at=final_state.get("completed_at")
+        )
+        self.db.add(job)
+        await self.db.flush()  # Get the ID
         
-        return path.id
+        # The logs are buffered in the workflow state and written here in a
+        # single multi-row insert, once per job
+        log_rows = [
+            {
+                "job_id": job.id,
+                "agent": entry["agent"],
+                "action": entry["action"][:200],
+                "iteration": entry.get("iteration", 0),
+                "details": entry.get("details"),
+                "created_at": entry.get("created_at")
+            }
+            for entry in final_state.get("agent_logs", [])
+        ]
+        if log_rows:
+            await self.db.execute(insert(AgentLog), log_rows)
+    
+    async def _upsert_tasks(
+        self,
+        task_rows: Dict[str, Dict[str, Any]],
+        task_items: Dict[str, Dict[Any, List[str]]]
+    ):
+        """
+        Insert or update tasks and their items with one statement per table.
+        
+        Args:
+            task_rows: Task column values keyed by task id
+            task_items: Requirement/criterion texts per item model, keyed by task id
+        """
+        if not task_rows:
+            return
+        
+        stmt = pg_insert(Task).values(list(task_rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_tasks_path_task",
+            set_={column: stmt.excluded[column] for column in TASK_UPSERT_COLUMNS}
+        ).returning(Task.id, Task.task_id)
+        result = await self.db.execute(stmt)
+        ids = {row.task_id: row.id for row in result}
+        
+        for model in (TaskRequirement, TaskAcceptanceCriterion):
+            rows = [
+                {"task_id": ids[task_id], "order_index": i, "text": text}
+                for task_id, items in task_items.items()
+                for i, text in enumerate(items[model])
+            ]
+            if rows:
+                stmt = pg_insert(model).values(rows)
+                await self.db.execute(stmt.on_conflict_do_update(
+                    index_elements=["task_id", "order_index"],
+                    set_={"text": stmt.excluded.text}
+                ))
     
     async def _ensure_unique_slug(self, base_slug: str) -> str:
         """Ensure slug is unique by appending number if needed."""
-        slug = base_slug
-        counter = 1
-        
-        while True:
-            result = await self.db.execute(
-                select(LearningPath).where(LearningPath.slug == slug)
+        # Fetch the base slug and all its numbered variants in one query
+        result = await self.db.execute(
+            select(LearningPath.slug).where(
+                or_(
+                    LearningPath.slug == base_slug,
+                    LearningPath.slug.like(f"{base_slug}-%")
+                )
             )
-            if not result.scalar_one_or_none():
-                return slug
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+        )
+        taken = set(result.scalars().all())
+        if base_slug not in taken:
+            return base_slug
+        
+        prefix = f"{base_slug}-"
+        counters = [
+            int(slug[len(prefix):]) for slug in taken
+            if slug[len(prefix):].isdigit()
+        ]
+        return f"{prefix}{max(counters, default=0) + 1}"
     
     async def get_path(self, path_id: UUID) -> Optional[LearningPath]:
         """Get a path by ID."""
@@ -208,22 +503,42 @@ class PathService:
         self,
         language: Optional[str] = None,
         area: Optional[str] = None,
+        difficulty_level: Optional[str] = None,
         limit: int = 100,
         offset: int = 0
-    ) -> List[LearningPath]:
-        """List paths with optional filtering."""
-        query = select(LearningPath).where(LearningPath.status == "active")
+    ) -> List[Dict[str, Any]]:
+        """
+        List paths with optional filtering.
+        
+        Returns plain rows with the summary columns, labelled like
+        PathListItem, instead of ORM objects; raw_data holds the whole path
+        tree and is never loaded here.
+        """
+        query = select(
+            LearningPath.id,
+            LearningPath.slug,
+            LearningPath.title,
+            LearningPath.description,
+            LearningPath.language,
+            LearningPath.area,
+            LearningPath.total_tasks.label("totalTasks"),
+            LearningPath.estimated_hours.label("estimatedHours"),
+            LearningPath.quality_score.label("qualityScore"),
+            LearningPath.created_at.label("createdAt")
+        ).where(LearningPath.status == "active")
         
         if language:
             query = query.where(LearningPath.language == language)
         if area:
             query = query.where(LearningPath.area == area)
+        if difficulty_level:
+            query = query.where(LearningPath.difficulty_level == difficulty_level)
         
         query = query.order_by(LearningPath.created_at.desc())
         query = query.offset(offset).limit(limit)
         
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return [dict(row) for row in result.mappings()]
     
     async def delete_path(self, path_id: UUID) -> bool:
         """Delete a path."""
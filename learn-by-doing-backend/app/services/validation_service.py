@@ -1,39 +1,85 @@
 """Resource validation service."""
 import asyncio
 from typing import List, Dict, Any
+from urllib.parse import urlsplit
 import httpx
 from app.config import get_settings
+from app.core.llm_cache import MemoryCacheBackend
 from app.core.logging import logger
 
 
 class ResourceValidator:
     """Validates resource URLs are accessible."""
     
+    MAX_CONCURRENT = 20
+    
+    # HEAD responses meaning the server doesn't implement HEAD
+    HEAD_UNSUPPORTED_STATUSES = frozenset({405, 501})
+    
     def __init__(self):
         settings = get_settings()
         self.timeout = settings.VALIDATION_TIMEOUT
+        # HTTP/2 multiplexes requests to the same host over one connection;
+        # the validator is shared app-wide, so keep a generous pool
         self.client = httpx.AsyncClient(
-            timeout=self.timeout,
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
             follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30),
             headers={
                 "User-Agent": "LearnByDoing-Validator/1.0"
             }
         )
+        # Hosts known to reject HEAD; their URLs go straight to GET
+        self._head_unsupported: set[str] = set()
+        self.trusted_hosts = frozenset(host.lower() for host in settings.VALIDATION_TRUSTED_HOSTS)
+        self.cache_ttl = settings.VALIDATION_CACHE_TTL
+        self._url_cache = MemoryCacheBackend(maxsize=settings.VALIDATION_CACHE_SIZE)
     
     async def validate_url(self, url: str) -> Dict[str, Any]:
         """
         Validate a single URL.
         
+        URLs on trusted hosts are accepted without a request, and results
+        that got an HTTP answer are reused for VALIDATION_CACHE_TTL seconds.
+        
         Returns:
             Dict with validation results
         """
+        host = urlsplit(url).netloc.lower()
+        if host in self.trusted_hosts:
+            return {
+                "url": url,
+                "accessible": True,
+                "status_code": None,
+                "content_type": None,
+                "error": None
+            }
+        
+        cached = await self._url_cache.get(url)
+        if cached is not None:
+            return dict(cached)
+        
+        result = await self._check_url(url, host)
+        # Timeouts and connection errors may be transient; only cache answers
+        if result["status_code"] is not None:
+            await self._url_cache.set(url, dict(result), self.cache_ttl)
+        return result
+    
+    async def _check_url(self, url: str, host: str) -> Dict[str, Any]:
+        """Request a URL and report whether it is accessible."""
         try:
-            # Try HEAD request first
-            response = await self.client.head(url)
+            response = None
+            if host not in self._head_unsupported:
+                # Try HEAD request first
+                response = await self.client.head(url)
+                if response.status_code in self.HEAD_UNSUPPORTED_STATUSES:
+                    self._head_unsupported.add(host)
             
-            # If HEAD fails, try GET
-            if response.status_code >= 400:
-                response = await self.client.get(url)
+            # If HEAD fails, try GET; only the headers are read, not the body
+            if response is None or response.status_code >= 400:
+                async with self.client.stream("GET", url) as response:
+                    pass
             
             return {
                 "url": url,
@@ -63,11 +109,14 @@ class ResourceValidator:
     async def validate_batch(
         self,
         resources: List[Dict[str, Any]],
-        max_concurrent: int = 10
+        max_concurrent: int = MAX_CONCURRENT
     ) -> List[Dict[str, Any]]:
         """
         Validate multiple URLs concurrently.
         
+        Each distinct URL is checked once and its result is reported for
+        every resource that links to it.
+        
         Args:
             resources: List of resource dicts with 'url' key
             max_concurrent: Maximum concurrent validations
@@ -75,32 +124,34 @@ class ResourceValidator:
         Returns:
             List of validation results
         """
+        urls_by_host: Dict[str, List[str]] = {}
+        for url in dict.fromkeys(r["url"] for r in resources):
+            urls_by_host.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+        
         semaphore = asyncio.Semaphore(max_concurrent)
+        by_url: Dict[str, Dict[str, Any]] = {}
         
-        async def validate_with_limit(resource: Dict[str, Any]) -> Dict[str, Any]:
+        async def check(url: str):
             async with semaphore:
-                result = await self.validate_url(resource["url"])
-                result["resource_title"] = resource.get("title", "Unknown")
-                return result
+                try:
+                    by_url[url] = await self.validate_url(url)
+                except Exception as e:
+                    by_url[url] = {"url": url, "accessible": False, "error": str(e)}
         
-        # Create tasks
-        tasks = [validate_with_limit(r) for r in resources]
+        async def check_host(host_urls: List[str]):
+            # The first URL resolves the host and opens its connection (and
+            # learns whether it supports HEAD); the host's other URLs then
+            # reuse them. Hosts don't wait for each other.
+            await check(host_urls[0])
+            await asyncio.gather(*(check(url) for url in host_urls[1:]))
         
-        # Run concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # At most max_concurrent requests in flight across all hosts
+        await asyncio.gather(*(check_host(host_urls) for host_urls in urls_by_host.values()))
         
-        # Process results
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    "url": resources[i]["url"],
-                    "accessible": False,
-                    "error": str(result),
-                    "resource_title": resources[i].get("title", "Unknown")
-                })
-            else:
-                processed_results.append(result)
+        processed_results = [
+            {**by_url[r["url"]], "resource_title": r.get("title", "Unknown")}
+            for r in resources
+        ]
         
         # Log summary
         accessible_count = sum(1 for r in processed_results if r["accessible"])
@@ -114,3 +165,9 @@ class ResourceValidator:
     async def close(self):
         """Close HTTP client."""
         await self.client.aclose()
+    
+    async def __aenter__(self) -> "ResourceValidator":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
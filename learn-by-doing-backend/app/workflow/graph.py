@@ -1,6 +1,8 @@
 """LangGraph workflow definition."""
+import asyncio
+from datetime import datetime, timezone
 from langgraph.graph import StateGraph, END
-from app.workflow.state import WorkflowState
+from app.workflow.state import WorkflowState, create_initial_state
 from app.agents.research import ResearchAgent
 from app.agents.curriculum import CurriculumAgent
 from app.agents.expert import ExpertAgent
@@ -8,31 +10,41 @@ from app.agents.quality import QualityAgent
 from app.core.logging import logger
 from app.config import get_settings
 
+settings = get_settings()
+
 
 def should_continue(state: WorkflowState) -> str:
     """
     Determine if workflow should continue or finalize.
     
     Returns:
-        'finalize' if approved or max iterations reached
+        'finalize' if approved, max iterations reached or the score plateaued
         'continue' to loop back to curriculum
     """
-    settings = get_settings()
     iteration = state.get("iteration", 0)
     approved = state.get("approved", False)
     
     # If approved, we're done
     if approved:
-        logger.info(f"Workflow approved on iteration {iteration}")
+        logger.info("Workflow approved on iteration %d", iteration)
         return "finalize"
     
     # If max iterations reached, force completion
     if iteration >= settings.MAX_ITERATIONS:
-        logger.warning(f"Max iterations ({settings.MAX_ITERATIONS}) reached, finalizing")
+        logger.warning("Max iterations (%d) reached, finalizing", settings.MAX_ITERATIONS)
+        return "finalize"
+    
+    # Stop if the last revision barely moved the score
+    history = state.get("score_history", [])
+    if len(history) >= 2 and history[-1] - history[-2] < settings.QUALITY_MIN_IMPROVEMENT:
+        logger.warning(
+            "Quality score converged (%.2f -> %.2f), finalizing",
+            history[-2], history[-1]
+        )
         return "finalize"
     
     # Otherwise, continue to next iteration
-    logger.info(f"Continuing to iteration {iteration + 1}")
+    logger.info("Continuing to iteration %d", iteration + 1)
     return "continue"
 
 
@@ -40,20 +52,17 @@ def finalize_node(state: WorkflowState) -> WorkflowState:
     """
     Finalize the workflow - prepare final output.
     """
-    from datetime import datetime
-    
     logger.info("Finalizing workflow")
     
     # Mark completion
-    state["completed_at"] = datetime.utcnow()
+    state["completed_at"] = datetime.now(timezone.utc)
     
-    # Set final output
-    if state.get("approved") and state.get("draft_curriculum"):
-        state["final_output"] = state["draft_curriculum"]
+    # Set final output; even if not approved, provide best effort
+    draft = state.get("draft_curriculum")
+    state["final_output"] = draft
+    if state.get("approved") and draft:
         logger.info("Final output prepared successfully")
     else:
-        # Even if not approved, provide best effort
-        state["final_output"] = state.get("draft_curriculum")
         logger.warning("Finalizing without full approval - best effort")
     
     return state
@@ -64,7 +73,7 @@ def create_workflow():
     Create and compile the LangGraph workflow.
     
     Workflow:
-    Research → Curriculum → Expert → Quality → [loop or end]
+    Research → Curriculum → Review (Expert + Quality) → [loop or end]
     
     Returns:
         Compiled workflow graph
@@ -75,25 +84,41 @@ def create_workflow():
     expert_agent = ExpertAgent()
     quality_agent = QualityAgent()
     
+    async def review_node(state: WorkflowState) -> WorkflowState:
+        """
+        Run the expert and quality reviews.
+        
+        The first quality review doesn't depend on expert feedback, so both
+        LLM calls run concurrently. Retries run them in order so the quality
+        review sees the expert's verdict on the revised draft.
+        """
+        if state.get("iteration", 0) <= 1:
+            await asyncio.gather(
+                expert_agent.run(state),
+                quality_agent.run(state, independent=True)
+            )
+            return state
+        
+        await expert_agent.run(state)
+        return await quality_agent.run(state)
+    
     # Create graph
     workflow = StateGraph(WorkflowState)
     
     # Add nodes
     workflow.add_node("research", research_agent.run)
     workflow.add_node("curriculum", curriculum_agent.run)
-    workflow.add_node("expert", expert_agent.run)
-    workflow.add_node("quality", quality_agent.run)
+    workflow.add_node("review", review_node)
     workflow.add_node("finalize", finalize_node)
     
     # Define edges
     workflow.set_entry_point("research")
     workflow.add_edge("research", "curriculum")
-    workflow.add_edge("curriculum", "expert")
-    workflow.add_edge("expert", "quality")
+    workflow.add_edge("curriculum", "review")
     
-    # Conditional routing from quality
+    # Conditional routing from review
     workflow.add_conditional_edges(
-        "quality",
+        "review",
         should_continue,
         {
             "continue": "curriculum",  # Loop back for improvements
@@ -116,8 +141,42 @@ _workflow = None
 
 
 def get_workflow():
-    """Get or create workflow instance."""
+    """
+    Get or create workflow instance.
+    
+    Construction is synchronous, so concurrent coroutines cannot interleave
+    inside it; the app also builds it at startup so no request pays for it.
+    """
     global _workflow
     if _workflow is None:
         _workflow = create_workflow()
     return _workflow
+
+
+async def run_batch_async(topics: list[str], max_concurrency: int = 10) -> list:
+    """
+    Run the workflow for several topics concurrently.
+    
+    Each topic gets its own initial state; the shared LLM client's rate
+    limiter still applies across all of them.
+    
+    Args:
+        topics: Topics to generate curricula for
+        max_concurrency: Maximum number of workflows running at once
+    
+    Returns:
+        Final states in the same order as topics; a failed run yields
+        its exception instead of a state
+    """
+    workflow = get_workflow()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run_one(topic: str):
+        async with semaphore:
+            return await workflow.ainvoke(create_initial_state(topic))
+    
+    logger.info("Running batch of %d workflows", len(topics))
+    return await asyncio.gather(
+        *(run_one(topic) for topic in topics),
+        return_exceptions=True
+    )
@@ -1,6 +1,10 @@
 """Workflow state definitions."""
+from collections import deque
 from typing import TypedDict, Optional, Any
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Oldest agent log entries are dropped past this many per run
+AGENT_LOG_LIMIT = 200
 
 
 class WorkflowState(TypedDict, total=False):
@@ -17,6 +21,16 @@ class WorkflowState(TypedDict, total=False):
     expert_feedback: dict[str, Any]
     quality_review: dict[str, Any]
     
+    # Serialized agent outputs, cached so prompts don't re-encode them
+    research_findings_json: Optional[str]
+    draft_curriculum_json: Optional[str]
+    
+    # Digest of the draft the current quality_review was made for
+    quality_review_hash: Optional[str]
+    
+    # Quality score after each review, oldest first
+    score_history: list[float]
+    
     # Control fields
     iteration: int
     approved: bool
@@ -26,7 +40,7 @@ class WorkflowState(TypedDict, total=False):
     started_at: datetime
     completed_at: Optional[datetime]
     errors: list[str]
-    agent_logs: list[dict[str, Any]]
+    agent_logs: deque[dict[str, Any]]
 
 
 def create_initial_state(
@@ -43,11 +57,12 @@ def create_initial_state(
         "draft_curriculum": {},
         "expert_feedback": {},
         "quality_review": {},
+        "score_history": [],
         "iteration": 0,
         "approved": False,
         "final_output": None,
-        "started_at": datetime.utcnow(),
+        "started_at": datetime.now(timezone.utc),
         "completed_at": None,
         "errors": [],
-        "agent_logs": []
+        "agent_logs": deque(maxlen=AGENT_LOG_LIMIT)
     }
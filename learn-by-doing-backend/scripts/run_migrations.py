@@ -1,14 +1,40 @@
 #!/usr/bin/env python3
 """Run database migrations."""
+import asyncio
 import sys
 sys.path.insert(0, '/app')
 
 from alembic.config import Config
 from alembic import command
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config import get_settings
+
+
+async def get_current_heads() -> set:
+    """Read the revisions the database is currently stamped with."""
+    engine = create_async_engine(get_settings().DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            return await connection.run_sync(
+                lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads())
+            )
+    finally:
+        await engine.dispose()
+
 
 # Create Alembic config
 alembic_cfg = Config('/app/alembic.ini')
 
+# Skip the upgrade (env.py, model imports, migration transaction) when
+# the database is already at head, which is the case on most restarts
+script_heads = set(ScriptDirectory.from_config(alembic_cfg).get_heads())
+if asyncio.run(get_current_heads()) == script_heads:
+    print("Database already at head, nothing to migrate")
+    sys.exit(0)
+
 # Run migrations
 command.upgrade(alembic_cfg, 'head')
 print("Migrations complete!")
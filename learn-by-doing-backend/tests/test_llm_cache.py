@@ -0,0 +1,65 @@
+"""Tests for the LLM response cache."""
+from app.agents import research
+from app.agents.research import ResearchAgent
+from app.core.llm_cache import LLMCache, MemoryCacheBackend
+from app.workflow.state import create_initial_state
+
+
+FINDINGS = {
+    "topic_analysis": {"what_is_it": "A systems language"},
+    "prerequisites": ["C basics"],
+    "core_concepts": [{"name": "Ownership", "difficulty": 3, "phase": 1}],
+    "ecosystem": {"essential_tools": ["cargo"]},
+    "scope_assessment": {"suggested_tasks": 12, "suggested_phases": 3}
+}
+
+
+class FakeLLM:
+    """Stands in for OpenRouterClient and counts the requests it serves."""
+    
+    model = "test-model"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def generate_json(self, messages, temperature=0.3, max_tokens=4000, **kwargs):
+        self.calls += 1
+        return {key: value for key, value in FINDINGS.items()}
+
+
+class FakeSearch:
+    """Returns the same results for every query."""
+    
+    async def search(self, query, max_results=10, **kwargs):
+        return [
+            {"title": "The Rust Book", "url": "https://doc.rust-lang.org/book/", "snippet": "Learn Rust"}
+        ]
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(maxsize=2)
+    await backend.set("a", 1, 60)
+    await backend.set("b", 2, 60)
+    await backend.get("a")
+    await backend.set("c", 3, 60)
+    
+    assert await backend.get("a") == 1
+    assert await backend.get("b") is None
+    assert await backend.get("c") == 3
+
+
+async def test_repeated_research_is_served_from_cache(monkeypatch):
+    llm = FakeLLM()
+    cache = LLMCache()
+    monkeypatch.setattr("app.agents.base.get_llm_client", lambda: llm)
+    monkeypatch.setattr(research, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(research, "get_search_client", FakeSearch)
+    agent = ResearchAgent()
+    
+    first = await agent.run(create_initial_state("Rust"))
+    second = await agent.run(create_initial_state("Rust"))
+    
+    assert llm.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert not first["errors"] and not second["errors"]
+    assert second["research_findings"] == first["research_findings"]
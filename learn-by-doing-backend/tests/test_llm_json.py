@@ -0,0 +1,49 @@
+"""Tests for parsing JSON out of LLM responses."""
+import pytest
+from app.core.exceptions import LLMException
+from app.core.llm import OpenRouterClient
+
+
+@pytest.fixture
+def client():
+    return OpenRouterClient()
+
+
+def test_strict_json(client):
+    assert client._parse_json('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_trailing_prose_is_ignored(client):
+    assert client._parse_json('{"a": 1}\nHope this helps!') == {"a": 1}
+
+
+def test_json5_fallback(client):
+    assert client._parse_json("{a: 'x', b: [1, 2,],}") == {"a": "x", "b": [1, 2]}
+    assert client.json5_fallbacks == 1
+
+
+def test_truncated_response_is_recovered(client):
+    parsed = client._parse_json('{"topic_analysis": {"what_is_it": "A language"}, "core_concepts": [{"name": "x"')
+    assert parsed == {"topic_analysis": {"what_is_it": "A language"}, "core_concepts": [{"name": "x"}]}
+
+
+def test_truncated_string_keeps_its_prefix(client):
+    assert client._parse_json('{"summary": "Ownership is') == {"summary": "Ownership is"}
+
+
+async def test_generate_json_recovers_truncated_fenced_response(client, monkeypatch):
+    async def generate_with_retry(messages, **kwargs):
+        return '```json\n{"topic_analysis": {"what_is_it": "A language"}, "core_concepts": [{"name": "x"'
+    
+    monkeypatch.setattr(client, "generate_with_retry", generate_with_retry)
+    parsed = await client.generate_json([{"role": "user", "content": "Analyze"}])
+    assert parsed["core_concepts"] == [{"name": "x"}]
+
+
+async def test_generate_json_wraps_unparseable_response(client, monkeypatch):
+    async def generate_with_retry(messages, **kwargs):
+        return "{]"
+    
+    monkeypatch.setattr(client, "generate_with_retry", generate_with_retry)
+    with pytest.raises(LLMException):
+        await client.generate_json([{"role": "user", "content": "Analyze"}])
@@ -0,0 +1,59 @@
+"""Tests for streamed LLM completions."""
+import httpx
+from app.core import llm
+from app.core.llm import OpenRouterClient
+from app.core.serialization import dumps
+
+
+DELTAS = [
+    '{"topic_analysis": {"what_is_it": "A language"}',
+    ', "prerequisites": ["C"]',
+    *(f', "extra_{i}": [{i}]' for i in range(20)),
+    '}'
+]
+
+
+def sse_body(deltas):
+    events = [
+        "data: " + dumps({"choices": [{"delta": {"content": delta}}]})
+        for delta in deltas
+    ]
+    return "\n\n".join([*events, "data: [DONE]"]) + "\n\n"
+
+
+def make_client():
+    client = OpenRouterClient()
+    client.client = httpx.AsyncClient(
+        base_url=client.base_url,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text=sse_body(DELTAS))
+        )
+    )
+    return client
+
+
+async def test_partial_parsing_stops_once_callback_is_done(monkeypatch):
+    parses = []
+    from_json = llm.from_json
+    
+    def counting_from_json(data, **kwargs):
+        parses.append(len(data))
+        return from_json(data, **kwargs)
+    
+    monkeypatch.setattr(llm, "from_json", counting_from_json)
+    
+    seen = []
+    
+    def on_partial(partial):
+        seen.append(list(partial))
+        return len(partial) >= 2
+    
+    client = make_client()
+    content = await client.generate(
+        [{"role": "user", "content": "Analyze"}], stream=True, on_partial=on_partial
+    )
+    await client.aclose()
+    
+    assert content == "".join(DELTAS)
+    assert seen == [["topic_analysis"], ["topic_analysis", "prerequisites"]]
+    assert len(parses) == 2
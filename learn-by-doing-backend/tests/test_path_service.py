@@ -0,0 +1,151 @@
+"""Tests for PathService request coalescing and saving."""
+import asyncio
+import pytest
+from uuid import uuid4
+from app.services import path_service
+from app.services.path_service import PathService
+
+
+def fake_generation(monkeypatch):
+    """Replace the workflow run and the save with counting fakes."""
+    calls = {"generate": 0, "save": []}
+    release = asyncio.Event()
+    
+    async def generate(self, topic, context, experience_level):
+        calls["generate"] += 1
+        await release.wait()
+        return {"path_id": uuid4(), "path_data": {"title": topic}, "final_state": {}}
+    
+    async def persist_path(path_id, path_data, final_state):
+        calls["save"].append(path_id)
+    
+    monkeypatch.setattr(PathService, "_generate", generate)
+    monkeypatch.setattr(PathService, "persist_path", staticmethod(persist_path))
+    return calls, release
+
+
+async def test_identical_requests_generate_and_save_once(monkeypatch):
+    calls, release = fake_generation(monkeypatch)
+    
+    requests = [
+        asyncio.create_task(PathService(db=None).generate_path("Rust", wait_for_save=wait))
+        for wait in (True, False, True)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*requests)
+    await path_service.wait_for_pending_saves()
+    
+    assert calls["generate"] == 1
+    assert calls["save"] == [results[0]["path_id"]]
+    assert all(result["path_id"] == results[0]["path_id"] for result in results)
+    assert not path_service._inflight and not path_service._pending_saves
+
+
+async def test_cancelled_leader_does_not_fail_joiners(monkeypatch):
+    calls, release = fake_generation(monkeypatch)
+    
+    leader = asyncio.create_task(PathService(db=None).generate_path("Go"))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(PathService(db=None).generate_path("Go"))
+    await asyncio.sleep(0)
+    
+    leader.cancel()
+    release.set()
+    result = await joiner
+    await path_service.wait_for_pending_saves()
+    
+    assert leader.cancelled()
+    assert result["path_data"] == {"title": "Go"}
+    assert calls["generate"] == 1
+    assert calls["save"] == [result["path_id"]]
+
+
+class FakeSession:
+    """Session stand-in that keeps what is added and committed."""
+    
+    def __init__(self, store):
+        self.store = store
+        self.added = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def add(self, obj):
+        self.added.append(obj)
+    
+    async def commit(self):
+        self.store.extend(self.added)
+    
+    async def rollback(self):
+        self.added = []
+
+
+async def test_failed_save_is_recorded_as_failed_job(monkeypatch):
+    committed = []
+    
+    async def save_path(self, path_data, final_state, path_id=None):
+        raise RuntimeError("value too long for type character varying(200)")
+    
+    monkeypatch.setattr(path_service, "AsyncSessionLocal", lambda: FakeSession(committed))
+    monkeypatch.setattr(PathService, "_save_path", save_path)
+    
+    path_id = uuid4()
+    with pytest.raises(RuntimeError):
+        await PathService.persist_path(path_id, {}, {"topic": "Rust", "context": "c" * 2000})
+    
+    [job] = committed
+    assert job.status == "failed"
+    assert job.path_id is None
+    assert job.result_data == {"path_id": str(path_id)}
+    assert "value too long" in job.error_message
+    assert len(job.context) == 1000
+
+
+def test_task_ids_are_unique_within_a_path():
+    phase = {"id": "basics"}
+    taken = {}
+    for index, task in enumerate([{"id": "t1"}, {"id": "t1"}, {}, {"id": "t1"}], start=1):
+        taken[path_service._task_id(task, phase, index, taken)] = task
+    
+    assert list(taken) == ["t1", "t1-2", "basics-task-3", "t1-3"]
+
+
+class SlugResult:
+    """Result stand-in returning the stored slugs."""
+    
+    def __init__(self, slugs):
+        self.slugs = slugs
+    
+    def scalars(self):
+        return self
+    
+    def all(self):
+        return list(self.slugs)
+
+
+class SlugSession:
+    """Session stand-in whose slug query returns a fixed set of slugs."""
+    
+    def __init__(self, slugs):
+        self.slugs = slugs
+    
+    async def execute(self, statement):
+        return SlugResult(self.slugs)
+
+
+@pytest.mark.parametrize("stored, expected", [
+    ([], "rust"),
+    (["rust-2"], "rust"),
+    (["rust"], "rust-1"),
+    (["rust", "rust-1", "rust-2"], "rust-3"),
+    (["rust", "rust-1", "rust-5"], "rust-6"),
+    (["rust", "rust-foo", "rust-async-2"], "rust-1"),
+])
+async def test_ensure_unique_slug(stored, expected):
+    service = PathService(db=SlugSession(stored))
+    
+    assert await service._ensure_unique_slug("rust") == expected
@@ -0,0 +1,88 @@
+"""Tests for conditional GETs of stored paths."""
+from datetime import datetime, timezone
+from uuid import uuid4
+import httpx
+import pytest
+from fastapi import Request, Response
+from app.api.deps import get_db
+from app.api.v1.paths import _not_modified
+from app.db.models import LearningPath
+from app.main import app
+from app.services.path_service import PathService
+
+
+@pytest.fixture
+def stored_path(monkeypatch):
+    path = LearningPath(
+        id=uuid4(),
+        slug="rust",
+        created_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+        updated_at=datetime(2024, 2, 2, tzinfo=timezone.utc)
+    )
+    
+    async def get_path(self, path_id):
+        return path if path_id == path.id else None
+    
+    async def no_db():
+        yield None
+    
+    monkeypatch.setattr(PathService, "get_path", get_path)
+    app.dependency_overrides[get_db] = no_db
+    yield path
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def get(path_id, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(f"/api/v1/paths/{path_id}", headers=headers)
+
+
+async def test_matching_etag_returns_not_modified(stored_path):
+    etag = f'W/"{stored_path.id}-{stored_path.updated_at.timestamp()}"'
+    
+    response = await get(stored_path.id, {"If-None-Match": etag})
+    
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, max-age=60"
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("header", [
+    'W/"{etag}"',
+    '"{etag}"',
+    '"other", W/"{etag}"',
+    'W/"other",W/"{etag}" , "more"',
+    '*',
+])
+async def test_if_none_match_lists_and_wildcard(stored_path, header):
+    tag = f"{stored_path.id}-{stored_path.updated_at.timestamp()}"
+    
+    response = await get(stored_path.id, {"If-None-Match": header.format(etag=tag)})
+    
+    assert response.status_code == 304
+
+
+def request_with(headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+def test_stale_etag_gets_caching_headers(stored_path):
+    response = Response()
+    
+    result = _not_modified(request_with({"If-None-Match": f'W/"{stored_path.id}-0"'}), response, stored_path)
+    
+    assert result is None
+    assert response.headers["etag"] == f'W/"{stored_path.id}-{stored_path.updated_at.timestamp()}"'
+    assert response.headers["cache-control"] == "private, max-age=60"
+
+
+async def test_missing_path_is_not_found(stored_path):
+    response = await get(uuid4(), {"If-None-Match": "*"})
+    
+    assert response.status_code == 404
@@ -0,0 +1,42 @@
+"""Tests for the web search result cache."""
+from app.agents.tools import WebSearchClient
+from app.core.llm_cache import MemoryCacheBackend
+
+
+def make_client(monkeypatch, maxsize):
+    client = WebSearchClient()
+    client._cache = MemoryCacheBackend(maxsize=maxsize)
+    client.requests = []
+    
+    async def fake_search_html(query, max_results, region, safesearch):
+        client.requests.append(query)
+        return [{"title": query, "url": f"https://example.com/{query}", "snippet": ""}]
+    
+    monkeypatch.setattr(client, "_search_html", fake_search_html)
+    return client
+
+
+async def test_repeated_query_is_served_from_cache(monkeypatch):
+    client = make_client(monkeypatch, maxsize=512)
+    
+    first = await client.search("rust ownership", max_results=3)
+    second = await client.search("rust ownership", max_results=3)
+    
+    assert client.requests == ["rust ownership"]
+    assert second == first
+
+
+async def test_least_recently_used_query_is_evicted(monkeypatch):
+    client = make_client(monkeypatch, maxsize=2)
+    
+    await client.search("a")
+    await client.search("b")
+    await client.search("a")
+    await client.search("c")
+    assert client.requests == ["a", "b", "c"]
+    
+    # "b" was the least recently used when "c" was added
+    await client.search("a")
+    await client.search("c")
+    await client.search("b")
+    assert client.requests == ["a", "b", "c", "b"]
@@ -0,0 +1,30 @@
+"""Tests for parsing DuckDuckGo HTML result pages."""
+from pathlib import Path
+from app.agents.tools import parse_html_results
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "ddg_html_results.html").read_text()
+
+
+def test_organic_results_are_parsed_and_ads_skipped():
+    results = parse_html_results(FIXTURE, max_results=10)
+    
+    assert [result["url"] for result in results] == [
+        "https://doc.rust-lang.org/book/ch04-01-what-is-ownership.html?highlight=borrow",
+        "https://rust-lang.org/learn",
+        "https://www.rust-lang.org/tools/install",
+    ]
+    assert results[0]["title"] == "What is Ownership? - The Rust Programming Language"
+    assert results[0]["snippet"].startswith("Ownership is a set of rules")
+    assert all(result["source"] == "duckduckgo" for result in results)
+
+
+def test_missing_snippet_is_empty():
+    results = parse_html_results(FIXTURE, max_results=10)
+    
+    assert results[1]["title"] == "Learn Rust"
+    assert results[1]["snippet"] == ""
+
+
+def test_results_stop_at_max_results():
+    assert len(parse_html_results(FIXTURE, max_results=2)) == 2
+    assert parse_html_results("<html><body>No results.</body></html>", max_results=5) == []
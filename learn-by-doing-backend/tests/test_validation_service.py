@@ -0,0 +1,64 @@
+"""Tests for ResourceValidator."""
+import asyncio
+import httpx
+from app.core.llm_cache import MemoryCacheBackend
+from app.services.validation_service import ResourceValidator
+
+
+def make_validator(handler, cache_size=4096):
+    validator = ResourceValidator()
+    validator.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    validator._url_cache = MemoryCacheBackend(maxsize=cache_size)
+    return validator
+
+
+async def test_checked_urls_are_cached_up_to_the_cache_size():
+    requested = []
+    
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200)
+    
+    async with make_validator(handler, cache_size=2) as validator:
+        for url in ("https://a.test/1", "https://a.test/2", "https://a.test/1", "https://a.test/3"):
+            assert (await validator.validate_url(url))["accessible"]
+        assert requested == ["https://a.test/1", "https://a.test/2", "https://a.test/3"]
+        
+        # /2 was the least recently used entry when /3 was added
+        await validator.validate_url("https://a.test/2")
+        assert requested[-1] == "https://a.test/2"
+        assert len(validator._url_cache._entries) == 2
+
+
+async def test_slow_host_does_not_hold_back_other_hosts():
+    requested = []
+    fast_done = asyncio.Event()
+    release_slow = asyncio.Event()
+    
+    async def handler(request):
+        url = str(request.url)
+        requested.append(url)
+        if request.url.host == "slow.test":
+            await release_slow.wait()
+        elif url == "https://fast.test/2":
+            fast_done.set()
+        return httpx.Response(200)
+    
+    resources = [
+        {"url": "https://slow.test/1", "title": "Slow 1"},
+        {"url": "https://slow.test/2", "title": "Slow 2"},
+        {"url": "https://fast.test/1", "title": "Fast 1"},
+        {"url": "https://fast.test/2", "title": "Fast 2"},
+    ]
+    async with make_validator(handler) as validator:
+        batch = asyncio.create_task(validator.validate_batch(resources))
+        
+        # fast.test's second URL runs while slow.test's first is still pending
+        await asyncio.wait_for(fast_done.wait(), timeout=1)
+        assert "https://slow.test/2" not in requested
+        
+        release_slow.set()
+        results = await batch
+    
+    assert [r["resource_title"] for r in results] == ["Slow 1", "Slow 2", "Fast 1", "Fast 2"]
+    assert all(r["accessible"] for r in results)
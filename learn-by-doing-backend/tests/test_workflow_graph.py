@@ -0,0 +1,30 @@
+"""Tests for the workflow's loop decision."""
+import pytest
+from app.workflow import graph
+from app.workflow.graph import should_continue
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(graph.settings, "MAX_ITERATIONS", 5)
+    monkeypatch.setattr(graph.settings, "QUALITY_MIN_IMPROVEMENT", 0.02)
+
+
+def test_approved_finalizes():
+    assert should_continue({"iteration": 1, "approved": True, "score_history": [0.9]}) == "finalize"
+
+
+def test_max_iterations_finalizes():
+    assert should_continue({"iteration": 5, "score_history": [0.5, 0.7]}) == "finalize"
+
+
+@pytest.mark.parametrize("history, expected", [
+    ([], "continue"),
+    ([0.5], "continue"),
+    ([0.5, 0.6], "continue"),
+    ([0.6, 0.61], "finalize"),
+    ([0.7, 0.65], "finalize"),
+    ([0.4, 0.6, 0.6], "finalize"),
+])
+def test_score_plateau_finalizes(history, expected):
+    assert should_continue({"iteration": 2, "score_history": history}) == expected